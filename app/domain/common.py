@@ -1,6 +1,11 @@
 import re
 import json
 
+try:
+    import re2  # google-re2: linear-time matching, no backtracking
+except ImportError:
+    re2 = None
+
 # Collections (one per entity type + chunks)
 COLL = {
     "chunks":           "rfp_chunks",
@@ -13,13 +18,31 @@ COLL = {
     "organizations":    "rfp_organizations",
 }
 
+def _compile_scanner(pattern: str, flags: int = 0):
+    """Compile with re2 when installed (same match API), else with re."""
+    if re2 is not None:
+        try:
+            return re2.compile(("(?i)" if flags & re.IGNORECASE else "") + pattern)
+        except Exception:
+            pass
+    return re.compile(pattern, flags)
+
 # EMAIL_RE = re.compile(r"^[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}$", re.I)
 WS = re.compile(r"\s+")
-EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
-PHONE_RE = re.compile(r"(?:\+?\d[\d\-\s().]{6,}\d)")
+# explicit ASCII classes instead of re.I: case folding differs between re and re2 (and with
+# re.ASCII) on characters like U+0131, so spelling the classes out keeps both engines in agreement
+_EMAIL_PATTERN = r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+_PHONE_PATTERN = r"(?:\+?\d[\d\-\s().]{6,}\d)"
+EMAIL_RE = _compile_scanner(_EMAIL_PATTERN)
+# always re with Unicode classes: PDF text separates digit groups with NBSP and other Unicode
+# spaces, which re2's (and re.ASCII's) \s does not match
+PHONE_RE = re.compile(_PHONE_PATTERN)
+# Both in one pass over a chunk; compiled with re like PHONE_RE so its \s/\d stay Unicode
+EMAIL_OR_PHONE_RE = re.compile(rf"(?P<e>{_EMAIL_PATTERN})|(?P<p>{_PHONE_PATTERN})")
 
 # Values that should be treated as "empty"
-MISSING_TOKENS = { "", "none", "null", "n/a", "na", "-", "--", "n\\a", "not applicable" }
+MISSING_TOKENS = frozenset({ "", "none", "null", "n/a", "na", "-", "--", "n\\a", "not applicable" })
+_MISSING_CHECK = MISSING_TOKENS.__contains__
 
 # Ensure keys exist; if absent, set to None so normalizers can handle them
 defaults_none = {
@@ -42,6 +65,13 @@ _STRING_FIELD = {"document_type","document_title","document_id","issue_date",
                   "client_organization","client_industry","project_scope",
                   "contract_term","submission_method","pricing_structure"}
 
+# Month names factored as a prefix trie: a failed position is rejected on its
+# first letter or two instead of retrying twelve separate alternatives
+_MONTH = (
+    r"(?:J(?:an(?:uary)?|une?|uly?)|Feb(?:ruary)?|Ma(?:r(?:ch)?|y)|A(?:pr(?:il)?|ug(?:ust)?)"
+    r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+
 # Compile once at import
 _DATE_REGEX = re.compile(
     r"""
@@ -61,9 +91,7 @@ _DATE_REGEX = re.compile(
       |
 
       # Month-name first: "Sep 29, 2025", "September 29th", "Jan 5"
-      (?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|
-         Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|
-         Nov(?:ember)?|Dec(?:ember)?)
+      """ + _MONTH + r"""
       [\s,.-]*
       (?:the\s+)?(?:0?[1-9]|[12]\d|3[01])(?:st|nd|rd|th)?(?:,?\s+(?:\d{4}|\d{2}))?
 
@@ -71,20 +99,17 @@ _DATE_REGEX = re.compile(
 
       # Day first: "29 September 2025", "29th Sep", "5th of May, 24"
       (?:0?[1-9]|[12]\d|3[01])(?:st|nd|rd|th)?\s+(?:of\s+)?
-      (?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|
-         Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|
-         Nov(?:ember)?|Dec(?:ember)?)
+      """ + _MONTH + r"""
       (?:,?\s+(?:\d{4}|\d{2}))?
 
       |
 
       # Month + Year only: "September 2025", "Sep 25"
-      (?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|
-         Jul(?:y)?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|
-         Nov(?:ember)?|Dec(?:ember)?)
+      """ + _MONTH + r"""
       \s+(?:\d{4}|\d{2})
     )\b
     """,
+    # no re.ASCII: \s must keep matching NBSP and other Unicode spaces common in PDF-extracted text
     re.IGNORECASE | re.VERBOSE
 )
 
@@ -1,8 +1,9 @@
 # v2 exports the sentinel via pydantic.fields
 from pydantic.fields import PydanticUndefined, FieldInfo
 from typing import List, Optional, Literal, Dict, Any
-from uuid import uuid4, UUID
-from pydantic import BaseModel, EmailStr, ValidationError, Field, field_validator
+from uuid import UUID
+from pydantic import BaseModel, EmailStr, ValidationError, model_validator
+from app.domain.common import _LIST_FIELDS
 
 class Chunk(BaseModel):
     doc_id: str
@@ -28,7 +29,7 @@ class EvalCriterion(BaseModel):
 class ExSchema(BaseModel):
     document_type: Optional[Literal["RFP","RFI","RFQ","Sources Sought","Other"]] = None
     document_title: Optional[str] = None
-    document_id: Optional[str] = Field(default_factory=lambda: str(uuid4())) # Unique identifier
+    document_id: Optional[str] = None  # allocated once per document by ingest_pdf
     issue_date: Optional[str] = None
     deadlines: Optional[List[Deadline]] = []
     client_organization: Optional[str] = None
@@ -43,9 +44,15 @@ class ExSchema(BaseModel):
     keywords: Optional[List[str]] = []
     compliance_standards: Optional[List[str]] = []
 
-    @field_validator(
-        "deadlines", "contacts", "evaluation_criteria", "requirements", "keywords", "compliance_standards",
-        mode="before"
-    )
+    @model_validator(mode="before")
+    @classmethod
     def none_to_empty_list(cls, v):
-        return [] if v is None else v
\ No newline at end of file
+        # one pass over the list fields instead of a validator dispatch per field;
+        # the caller's dict is copied only when something needs fixing
+        if isinstance(v, dict):
+            missing = [k for k in _LIST_FIELDS if k in v and v[k] is None]
+            if missing:
+                v = dict(v)
+                for k in missing:
+                    v[k] = []
+        return v
\ No newline at end of file
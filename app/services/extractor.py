@@ -1,15 +1,19 @@
 import os
 import json
-from typing import List, Dict, Any, Optional
+from copy import deepcopy
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Iterable
 from langchain_core.documents import Document
 from app.domain.model import ExSchema
 from app.domain.common import OUTPUT_SCHEMA, PREV_STATE
-from app.utils.prompt import build_system_prompt, build_user_prompt
+from app.utils.prompt import build_system_prompt, build_user_prompt, PROMPT_VERSION
 from app.utils.llm import invoke_with_retries
+from app.utils.process_text import ChunkDeduper, text_fingerprint
 from app.utils.process_entity import (
     sanitize_llm_extraction,
     contains_date,
-    filter_with_prev_backup,
+    filter_batch_with_prev_backup,
 )
 from tqdm import tqdm
 from app.utils.process_json import (
@@ -17,20 +21,164 @@ from app.utils.process_json import (
     extract_json_between_braces,
     validate_extraction_json,
     unresolved_fields,
-    ensure_defaults
+    prune_resolved,
+    ensure_defaults,
+    json_dumps,
 )
 import logging
 # Initialize global objects
 logger = logging.getLogger(__name__)
 
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+    logger.debug("Optional diskcache module not installed, LLM extractions are not cached across runs.")
+
+# Number of chunks whose LLM calls are in flight at the same time
+LLM_EXTRACT_CONCURRENCY = int(os.getenv("LLM_EXTRACT_CONCURRENCY", 4))
+# Documents are handed to `document_sink` in batches of this size instead of being retained
+DOCUMENT_SINK_BATCH_SIZE = int(os.getenv("DOCUMENT_SINK_BATCH_SIZE", 64))
+# Exact duplicate chunks never reach the LLM. Skipping near duplicates (SimHash distance) is opt-in:
+# it is lossy, a chunk that only changes a date or a contact would never be extracted
+LLM_SKIP_NEAR_DUPLICATES = os.getenv("LLM_SKIP_NEAR_DUPLICATES", "false").lower() == "true"
+LLM_NEAR_DUP_MAX_HAMMING = int(os.getenv("LLM_NEAR_DUP_MAX_HAMMING", 3))
+# On-disk cache of per-chunk LLM outputs keyed by (model, PROMPT_VERSION, chunk hash); empty disables it
+LLM_EXTRACT_CACHE_DIR = os.getenv("LLM_EXTRACT_CACHE_DIR", ".cache/llm_extract")
+
+# Read-only view of the shared schema and a frozen PREV_STATE template (lists stored as tuples),
+# so a run can never leak mutations back into the module-level globals
+_OUTPUT_SCHEMA = MappingProxyType(OUTPUT_SCHEMA)
+_PREV_TEMPLATE = MappingProxyType({k: tuple(v) if isinstance(v, list) else v for k, v in deepcopy(PREV_STATE).items()})
+
+def _fresh_prev_state() -> Dict[str, Any]:
+    """Allocate a new starting state with its own empty lists."""
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in _PREV_TEMPLATE.items()}
+
+def _open_extract_cache():
+    if diskcache is None or not LLM_EXTRACT_CACHE_DIR:
+        return None
+    try:
+        return diskcache.Cache(LLM_EXTRACT_CACHE_DIR)
+    except Exception:
+        logger.exception("Could not open the LLM extraction cache at %s", LLM_EXTRACT_CACHE_DIR)
+        return None
+
+def _extract_window(executor, llm, sys: str, texts: List[str], prev_state: Dict[str, Any],
+                    hint: List[str], cache=None, stats: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Runs the LLM calls for a window of chunks concurrently against the same
+    prev_state snapshot, then merges the outputs back in chunk order.
+    filter_with_prev_backup only accepts values evidenced by each chunk's own text,
+    so merging against a slightly stale snapshot keeps the sequential semantics.
+    With a `cache`, chunks extracted by an earlier run (same model and prompt) reuse the
+    cached output instead of calling the LLM; `stats` counts the hits and lookups.
+    """
+    # every prompt in the window embeds the same snapshot, serialize it once
+    prev_state_json = json_dumps(prev_state)
+    keys = [(getattr(llm, "model", ""), PROMPT_VERSION, text_fingerprint(text)) for text in texts] if cache is not None else None
+    futures = []
+    for i, text in enumerate(texts):
+        hit = _cached_result(cache, keys[i], stats) if cache is not None else None
+        futures.append(hit if hit is not None else executor.submit(
+            invoke_with_retries,
+            llm=llm,
+            sys_base=sys,
+            user_base=build_user_prompt(prev_state, text, hint, prev_state_json=prev_state_json),
+            schema_model=ExSchema,
+            ensure_defaults_fn=ensure_defaults,
+            sanitize_fn=sanitize_llm_extraction,
+            extract_json_fn=extract_json_between_braces,
+            contains_date_fn=contains_date,
+            prev_state=prev_state,     # optional; you can also bake it into `user`
+            retries=2,                 # default
+        ))
+    # collect the window's outputs in chunk order, then merge them in one pass
+    batch = []
+    for i, (text, future) in enumerate(zip(texts, futures)):
+        try:
+            clean_data, err = future.result()
+            if clean_data is not None:
+                if cache is not None and not isinstance(future, _CachedResult):
+                    _store_result(cache, keys[i], clean_data)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cleaned LLM Output L1: %s", json_dumps(clean_data))
+                batch.append((clean_data, text))
+            else:
+                logger.warning("Extraction failed after retries: %s", err)
+        except Exception:
+            logger.exception("Error processing chunk")
+            continue
+    if not batch:
+        return prev_state
+    try:
+        # cleaned, log = filter_payload_by_chunk(clean_data, text)
+        cleaned, log = filter_batch_with_prev_backup(batch, prev_clean=prev_state)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cleaned LLM Output L2: %s", json_dumps(cleaned))
+        prev_state = cleaned
+        _ = prev_state.pop('document_id', None)  # remove document_id to avoid overwriting
+        # Secondary local validation to be extra safe
+        ok = validate_extraction_json(model=ExSchema, payload=cleaned)
+        if not ok["ok"]:
+            logger.warning("Merged state failed validation: %s", ok["error"])
+    except Exception:
+        logger.exception("Error merging chunk outputs")
+    return prev_state
+
+class _CachedResult:
+    """Stands in for a future whose (clean_data, error) result came from the extraction cache."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Dict[str, Any]):
+        self.value = value
+
+    def result(self):
+        return self.value, None
+
+def _cached_result(cache, key, stats: Optional[Dict[str, int]]) -> Optional[_CachedResult]:
+    try:
+        value = cache.get(key)
+    except Exception:
+        logger.exception("LLM extraction cache lookup failed")
+        value = None
+    if stats is not None:
+        stats["lookups"] += 1
+        stats["hits"] += value is not None
+    return _CachedResult(value) if value is not None else None
+
+def _store_result(cache, key, clean_data: Dict[str, Any]) -> None:
+    try:
+        cache.set(key, clean_data)
+    except Exception:
+        logger.exception("LLM extraction cache write failed")
+
 # ---------- LLM extractor tool (OpenAI Structured Outputs) ----------
-def extract_entities_llm(pdfs: List[List[Dict[str, Any]]], system_prompt: Optional[str] = None) -> tuple[Dict[str, Any], List[Document]]:
+def _iter_chunk_docs(chunks: List[Dict[str, Any]]):
+    """Lazily yields a Document per non-empty chunk."""
+    for chunk in chunks:
+        try:
+            text, metadata = ingest_json_results_to_blob([chunk])
+            # if text is empty, skip this chunk
+            if text.strip() == "":
+                continue
+            yield Document(page_content=text, metadata=metadata[-1])
+        except Exception:
+            logger.exception("Error processing chunk")
+
+def extract_entities_llm(pdfs: Iterable[List[Dict[str, Any]]], system_prompt: Optional[str] = None,
+                         max_workers: int = LLM_EXTRACT_CONCURRENCY,
+                         document_sink: Optional[Callable[[List[Document]], Any]] = None,
+                         sink_batch_size: int = DOCUMENT_SINK_BATCH_SIZE) -> tuple[Dict[str, Any], List[Document]]:
     """
     Calls OpenAI Responses API with a JSON Schema to guarantee a single JSON object.
     All fields default to null or [] if not present in the chunk.
+    `pdfs` is consumed lazily, so it may be a generator fed by a running ingestion.
+    Up to `max_workers` chunk calls are issued concurrently; max_workers=1 is fully sequential.
+    If `document_sink` is given (e.g. `vs.add_documents`), chunk documents are flushed to it in
+    batches of `sink_batch_size` and the returned document list is empty.
     """
     from crewai import LLM
-    global PREV_STATE, OUTPUT_SCHEMA
     # --- 1. Set environment variables in code --------------------------------
     # os.environ["OPENAI_API_KEY"]   = config.api_key  
     # os.environ["OPENAI_API_BASE"]  = config.base_url
@@ -40,56 +188,45 @@ def extract_entities_llm(pdfs: List[List[Dict[str, Any]]], system_prompt: Option
     model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini")
     llm = LLM(model=model_name, base_url=base_url, api_key=api_key, temperature=0.2, top_p=1.0)
 
-    # Build JSON Schema for strict validation on the model side
-    schema = OUTPUT_SCHEMA.copy()
+    # Build JSON Schema for strict validation on the model side.
+    # The schema is fixed for the whole run, so the system prompt is built once.
+    sys = build_system_prompt(_OUTPUT_SCHEMA)
     # --- 2. Call LLM for each chunk -------------------------------------------
-    results = []
-    prev_state = PREV_STATE.copy()  # start with all fields None/[]
-    documents = []
-    for chunks in pdfs:
-        chunks_progress = tqdm(chunks, total=len(chunks), unit="doc", desc="extracting entities:")
-        for chunk in chunks_progress:
-            try:
-                text, metadata = ingest_json_results_to_blob([chunk])
-                # if text is empty, skip this chunk
-                if text.strip() == "":
-                    continue
-                doc = Document(page_content=text, metadata=metadata[-1])
+    window_size = max(1, max_workers)
+    sink_batch_size = max(1, sink_batch_size)
+    prev_state = _fresh_prev_state()  # start with all fields None/[]
+    unresolved = unresolved_fields(prev_state)  # shrinks as fields get filled
+    documents: List[Document] = []
+    deduper = ChunkDeduper(near_duplicates=LLM_SKIP_NEAR_DUPLICATES, max_hamming=LLM_NEAR_DUP_MAX_HAMMING)
+    cache = _open_extract_cache()
+    cache_stats = {"hits": 0, "lookups": 0}
+    with ThreadPoolExecutor(max_workers=window_size) as executor:
+        for chunks in pdfs:
+            chunks_progress = tqdm(chunks, total=len(chunks), unit="doc", desc="extracting entities:")
+            window: List[str] = []
+            for doc in _iter_chunk_docs(chunks_progress):
                 documents.append(doc)
-                sys = build_system_prompt(schema)
-                user = build_user_prompt(prev_state, text, unresolved_fields(prev_state))
-                # invoke LLM with retries
-                clean_data, err = invoke_with_retries(
-                                    llm=llm,
-                                    sys_base=sys,
-                                    user_base=user,
-                                    schema_model=ExSchema,
-                                    ensure_defaults_fn=ensure_defaults,
-                                    sanitize_fn=sanitize_llm_extraction,
-                                    extract_json_fn=extract_json_between_braces,
-                                    contains_date_fn=contains_date,
-                                    prev_state=prev_state,     # optional; you can also bake it into `user`
-                                    retries=2,                 # default
-                                )
-                # print("Cleaned LLM Output L1:", json.dumps(clean_data, indent=2))
-                if clean_data is not None:
-                    # cleaned, log = filter_payload_by_chunk(clean_data, text)
-                    cleaned, log = filter_with_prev_backup(clean_data, text, prev_clean=prev_state)
-                    # print("Cleaned LLM Output L2:", json.dumps(cleaned, indent=2))
-                    prev_state = cleaned
-                    _ = prev_state.pop('document_id', None)  # remove document_id to avoid overwriting
-                    # Secondary local validation to be extra safe
-                    ok = validate_extraction_json(model=ExSchema, payload=cleaned)
-                    if not ok["ok"]:
-                        continue
-                    else:
-                        results.append(ok["data"])
-                else:
-                    print("Extraction failed after retries:", err)
-            
-            except Exception as e:
-                print(f"Error processing chunk: {e}")
-                continue
-            
+                if document_sink is not None and len(documents) >= sink_batch_size:
+                    document_sink(documents)
+                    documents = []
+                # repeated boilerplate carries no new information, keep the document but skip the LLM call
+                if deduper.is_duplicate(doc.page_content):
+                    logger.debug("Skipping duplicate chunk")
+                    continue
+                window.append(doc.page_content)
+                if len(window) == window_size:
+                    prev_state = _extract_window(executor, llm, sys, window, prev_state, unresolved, cache, cache_stats)
+                    unresolved = prune_resolved(unresolved, prev_state)
+                    window = []
+            if window:
+                prev_state = _extract_window(executor, llm, sys, window, prev_state, unresolved, cache, cache_stats)
+                unresolved = prune_resolved(unresolved, prev_state)
+    if document_sink is not None and documents:
+        document_sink(documents)
+        documents = []
+    if cache is not None:
+        logger.info("LLM extraction cache: %d/%d chunks served from cache", cache_stats["hits"], cache_stats["lookups"])
+        cache.close()
+
     #   return {"_error": ok["error"]}  # callers can decide to retry
-    return prev_state, documents
\ No newline at end of file
+    return prev_state, documents
@@ -2,22 +2,27 @@ from pydantic import BaseModel
 from typing import Any, Dict, List, Tuple, Optional
 from langchain_core.documents import Document
 from app.utils.process_json import ingest_json_results_to_blob
+from app.utils.process_text import dedupe_documents
 from uuid import uuid4
 import os
 import logging
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from app.utils.common import get_config, get_env_variable, prepare_custom_metadata_dataframe
-from nv_ingest_client.client import NvIngestClient, Ingestor
 
 logger = logging.getLogger(__name__)
 
 ENABLE_NV_INGEST_VDB_UPLOAD = False # When enabled entire ingestion would be performed using nv-ingest
 
+@lru_cache(maxsize=1)
 def get_nv_ingest_client():
     """
-    Creates and returns NV-Ingest client
+    Creates and returns NV-Ingest client.
+    The client is created on first use and shared by every later caller.
     """
+    from nv_ingest_client.client import NvIngestClient
     config = get_config()
 
     client = NvIngestClient(
@@ -46,86 +51,119 @@ def _doc(text: str, content_metadata: Dict[str, Any], source_name: Optional[str]
         md["source"] = source_name
     return Document(page_content=text, metadata=md)
 
-def ingest_chunks(vs, chunks: List[Chunk], doc_id: str):
+def _chunk_docs(chunks: List[Chunk], doc_id: str) -> List[Document]:
     docs = []
     for c in chunks:
         text, meta = ingest_json_results_to_blob([c])
         docs.append(_doc(
             text=text,
-            content_metadata={"doc_id": str(uuid4()), "page": meta[0].get("page_number", ""), "source_type": meta[0].get("source_type",""), "filepath": meta[0].get("source_id",""), "doc_id": doc_id},
+            content_metadata={"page": meta[0].get("page_number", ""), "source_type": meta[0].get("source_type",""), "filepath": meta[0].get("source_id",""), "doc_id": doc_id},
             source_name=f"{meta[0].get('source_id','').split("/")[-1]}#p{meta[0].get('page_number','')}"
         ))
-    # print(docs)
-    if docs:
-        vs.add_documents(docs)
+    return docs
 
-def ingest_requirements(vs, doc_id: str, requirements: List[str]):
-    docs = [_doc(r, {"doc_id": doc_id}) for r in requirements if r]
-    # print(docs)
-    if docs:
-        vs.add_documents(docs)
+def _requirement_docs(doc_id: str, requirements: List[str]) -> List[Document]:
+    return [_doc(r, {"doc_id": doc_id}) for r in requirements if r]
 
-def ingest_criteria(vs, doc_id: str, criteria: List[str] | List[Dict[str,str]]):
+def _criteria_docs(doc_id: str, criteria: List[str] | List[Dict[str,str]]) -> List[Document]:
     texts = [(c["criterion"] if isinstance(c, dict) else c) for c in (criteria or [])]
-    docs = [_doc(t, {"doc_id": doc_id}) for t in texts if t]
-    # print(docs)
-    if docs:
-        vs.add_documents(docs)
+    return [_doc(t, {"doc_id": doc_id}) for t in texts if t]
 
-def ingest_contacts(vs, doc_id: str, contacts: List[Dict[str, Any]]):
+def _contact_docs(doc_id: str, contacts: List[Dict[str, Any]]) -> List[Document]:
     # Assumes you already ran your guardrails: only literal email/phone from chunk, etc.
     docs = []
+    append = docs.append
     for c in contacts or []:
-        name, title = c.get("name") or "", c.get("title") or ""
-        email, phone = (c.get("email") or ""), (c.get("phone") or "")
-        text = " ".join(x for x in [name, title, email, phone] if x).strip()
-        docs.append(_doc(text, {"doc_id": doc_id, "name": name, "title": title, "email": email, "phone": phone}))
-    if docs:
-        vs.add_documents(docs)
-
-def ingest_deadlines(vs, doc_id: str, deadlines: List[Dict[str, Any]]):
+        get = c.get
+        name, title = get("name") or "", get("title") or ""
+        email, phone = get("email") or "", get("phone") or ""
+        text = " ".join(filter(None, (name, title, email, phone))).strip()
+        append(_doc(text, {"doc_id": doc_id, "name": name, "title": title, "email": email, "phone": phone}))
+    return docs
+
+def _deadline_docs(doc_id: str, deadlines: List[Dict[str, Any]]) -> List[Document]:
     docs = []
+    append = docs.append
     for d in deadlines or []:
-        date, kind = d.get("date") or "", d.get("kind") or ""
+        get = d.get
+        date, kind = get("date") or "", get("kind") or ""
         text = f"{date} {kind}".strip()
-        docs.append(_doc(text, {"doc_id": doc_id, "date": date, "kind": kind}))
+        append(_doc(text, {"doc_id": doc_id, "date": date, "kind": kind}))
+    return docs
+
+def _token_docs(doc_id: str, tokens: List[str], norm: str = "lower") -> List[Document]:
+    case = str.lower if norm == "lower" else str.upper  # pick the case once, not per token
+    toks = [case(t.strip()) for t in (tokens or []) if t]
+    return [_doc(t, {"doc_id": doc_id, "token": t}) for t in toks]
+
+def _org_docs(doc_id: str, org_name: Optional[str], industry: Optional[str]) -> List[Document]:
+    if not org_name:
+        return []
+    text = f"{org_name} {industry or ''}".strip()
+    return [_doc(text, {"doc_id": doc_id, "org_name": org_name, "industry": industry or ""})]
+
+def entities_to_docs(entities: Dict[str, Any], doc_id: str) -> Dict[str, List[Document]]:
+    """
+    Builds the documents for every entity collection, keyed like COLL
+    (everything but "chunks"), so inserts can loop over the collections.
+    """
+    return {
+        "requirements": _requirement_docs(doc_id, entities.get("requirements") or []),
+        "criteria": _criteria_docs(doc_id, entities.get("evaluation_criteria") or []),
+        "contacts": _contact_docs(doc_id, entities.get("contacts") or []),
+        "deadlines": _deadline_docs(doc_id, entities.get("deadlines") or []),
+        "technologies": _token_docs(doc_id, entities.get("key_technologies") or [], norm="lower"),
+        "standards": _token_docs(doc_id, entities.get("compliance_standards") or [], norm="upper"),
+        "organizations": _org_docs(doc_id, entities.get("client_organization"), entities.get("client_industry")),
+    }
+
+def _add(vs, docs: List[Document]) -> None:
+    from app.utils.vectorstore import add_documents_batched
     if docs:
-        vs.add_documents(docs)
+        add_documents_batched(vs, docs)
+
+def ingest_chunks(vs, chunks: List[Chunk], doc_id: str):
+    _add(vs, _chunk_docs(chunks, doc_id))
+
+def ingest_requirements(vs, doc_id: str, requirements: List[str]):
+    _add(vs, _requirement_docs(doc_id, requirements))
+
+def ingest_criteria(vs, doc_id: str, criteria: List[str] | List[Dict[str,str]]):
+    _add(vs, _criteria_docs(doc_id, criteria))
+
+def ingest_contacts(vs, doc_id: str, contacts: List[Dict[str, Any]]):
+    _add(vs, _contact_docs(doc_id, contacts))
+
+def ingest_deadlines(vs, doc_id: str, deadlines: List[Dict[str, Any]]):
+    _add(vs, _deadline_docs(doc_id, deadlines))
 
 def ingest_tokens(vs, doc_id: str, tokens: List[str], norm: str = "lower"):
-    toks = [t.strip().lower() if norm == "lower" else t.strip().upper() for t in (tokens or []) if t]
-    docs = [_doc(t, {"doc_id": doc_id, "token": t}) for t in toks]
-    if docs:
-        vs.add_documents(docs)
+    _add(vs, _token_docs(doc_id, tokens, norm=norm))
 
 def ingest_org(vs, doc_id: str, org_name: Optional[str], industry: Optional[str]):
-    if not org_name:
-        return
-    text = f"{org_name} {industry or ''}".strip()
-    vs.add_documents([_doc(text, {"doc_id": doc_id, "org_name": org_name, "industry": industry or ""})])
+    _add(vs, _org_docs(doc_id, org_name, industry))
 
-def ingest_pdf(entities: Dict[str, Any], chunks: List[Chunk], 
-               vs_chunks, vs_requirements, vs_criteria, vs_contacts, vs_deadlines, vs_tech, vs_std, vs_org):
+def ingest_pdf(entities: Dict[str, Any], chunks: List[Chunk], vs: Dict[str, Any]):
     """
     Ingests the extracted entities and chunks into their respective vector stores.
+    `vs` maps each COLL key ("chunks", "requirements", ...) to its vector store.
     """
+    from app.utils.vectorstore import add_documents_batched
     try:
         assert isinstance(entities, dict)
         assert isinstance(chunks, list) and all(isinstance(c, Chunk) for c in chunks)
         # Use provided document_id or generate a new one
         doc_id = entities.get("document_id") or str(uuid4())
-        # chunks
-        ingest_chunks(vs_chunks, chunks, doc_id=doc_id)
-
-        # entities
-        ingest_requirements(vs_requirements, doc_id, entities.get("requirements") or [])
-        ingest_criteria(vs_criteria, doc_id, entities.get("evaluation_criteria") or [])
-        ingest_contacts(vs_contacts, doc_id, entities.get("contacts") or [])
-        ingest_deadlines(vs_deadlines, doc_id, entities.get("deadlines") or [])
-        ingest_tokens(vs_tech, doc_id, entities.get("key_technologies") or [], norm="lower")
-        ingest_tokens(vs_std,  doc_id, entities.get("compliance_standards") or [], norm="upper")
-        ingest_org(vs_org, doc_id, entities.get("client_organization"), entities.get("client_industry"))
+        # repeated boilerplate chunks would only add identical rows to the chunk collection
+        docs_by_coll = {"chunks": dedupe_documents(_chunk_docs(chunks, doc_id)), **entities_to_docs(entities, doc_id)}
+        # Every entity type lives in its own collection, so the inserts (and the
+        # embedding calls behind them) are independent and can run concurrently
+        with ThreadPoolExecutor(max_workers=len(docs_by_coll)) as executor:
+            futures = [executor.submit(add_documents_batched, vs[key], docs)
+                       for key, docs in docs_by_coll.items() if docs]
+            for future in futures:
+                future.result()  # surface the first failure
         return doc_id
     except Exception as e:
         print(f"[ERROR] An error occurred during ingestion: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,31 @@
+"""Concurrent local file loading.
+1. read_files: Read many files concurrently, keeping at most `depth` reads in flight.
+2. read_files_sync: Blocking wrapper around read_files for synchronous callers.
+"""
+
+import asyncio
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+async def read_files(paths: List[str], depth: int = 64) -> List[bytes]:
+    """
+    Reads `paths` concurrently on the default thread pool, with at most `depth` reads in flight.
+    Returns the contents in the order of `paths`; the first failing read raises.
+    """
+    sem = asyncio.Semaphore(max(1, depth))
+
+    async def _read(path: str) -> bytes:
+        async with sem:
+            return await asyncio.to_thread(_read_bytes, path)
+
+    return list(await asyncio.gather(*(_read(p) for p in paths)))
+
+def read_files_sync(paths: List[str], depth: int = 64) -> List[bytes]:
+    """Runs read_files on a private event loop; must not be called from a running loop."""
+    return asyncio.run(read_files(paths, depth=depth))
@@ -22,7 +22,7 @@
 
 import logging
 import os
-from functools import wraps
+from functools import wraps, lru_cache
 from typing import Callable, Any, TYPE_CHECKING, List, Dict, Tuple
 import ast
 
@@ -78,9 +78,13 @@ def utils_cache(func: Callable) -> Callable:
 
     return wrapper
 
-# @lru_cache
+@lru_cache(maxsize=1)
 def get_config() -> "ConfigWizard":
-    """Parse the application configuration."""
+    """
+    Parse the application configuration.
+    The parsed config is cached for the life of the process; call `get_config.cache_clear()`
+    after changing APP_CONFIG_FILE or the APP_* environment overrides.
+    """
     config_file = os.environ.get("APP_CONFIG_FILE", "/dev/null")
     config = configuration.AppConfig.from_file(config_file)
     if config:
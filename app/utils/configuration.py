@@ -188,6 +188,42 @@ class NvIngestConfig(ConfigWizard):
         help_txt="Enable post chunk split for NV Ingest",
     )
 
+    # Client-side Batch Configuration Parameters
+    enable_batch_mode: bool = configfield(
+        "enable_batch_mode",
+        env_name="ENABLE_NV_INGEST_BATCH_MODE",
+        default=True,
+        help_txt="Submit files to NV Ingest in batches of files_per_batch",
+    )
+
+    files_per_batch: int = configfield(
+        "files_per_batch",
+        env_name="NV_INGEST_FILES_PER_BATCH",
+        default=16,
+        help_txt="Number of files per NV Ingest batch",
+    )
+
+    enable_parallel_batch_mode: bool = configfield(
+        "enable_parallel_batch_mode",
+        env_name="ENABLE_NV_INGEST_PARALLEL_BATCH_MODE",
+        default=True,
+        help_txt="Run several NV Ingest batches concurrently",
+    )
+
+    concurrent_batches: int = configfield(
+        "concurrent_batches",
+        env_name="NV_INGEST_CONCURRENT_BATCHES",
+        default=4,
+        help_txt="Number of NV Ingest batches in flight in parallel batch mode",
+    )
+
+    preload_files: bool = configfield(
+        "preload_files",
+        env_name="NV_INGEST_PRELOAD_FILES",
+        default=True,
+        help_txt="Read batch files into memory concurrently before submission (needs Ingestor.buffers)",
+    )
+
 
 @configclass
 class ModelParametersConfig(ConfigWizard):
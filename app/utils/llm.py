@@ -1,12 +1,43 @@
+import os
 import json
-from typing import Optional, Tuple, Dict, Any
+import random
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Tuple, Dict, Any, List
 from pydantic import ValidationError
 import time
 from app.utils.prompt import _error_addendum
+from app.utils.process_json import json_loads, decode_first_json_object
 import logging
 # Initialize global objects
 logger = logging.getLogger(__name__)
 
+# Seconds a retry call may run before a duplicate (hedged) request is fired; <= 0 disables hedging
+LLM_HEDGE_AFTER_SEC = float(os.getenv("LLM_HEDGE_AFTER_SEC", 20))
+
+def _hedged_call(llm, messages: List[Dict[str, str]], hedge_after: float):
+    """
+    Calls llm.call(messages); if no answer arrives within `hedge_after` seconds,
+    fires a second identical request and returns whichever succeeds first.
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = [executor.submit(llm.call, messages=messages)]
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            futures.append(executor.submit(llm.call, messages=messages))
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        # do not block on the losing request
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def invoke_with_retries(
     llm,
     sys_base: str,
@@ -20,41 +51,44 @@ def invoke_with_retries(
     prev_state: Optional[Dict[str, Any]] = None,
     retries: int = 2,
     backoff_sec: float = 0.6,
+    hedge_after_sec: float = LLM_HEDGE_AFTER_SEC,
 ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
     Returns (clean_data, error_message). On success, error_message is None.
     On failure after all retries, returns (None, last_error).
+    Retries back off exponentially with jitter and are hedged after `hedge_after_sec`.
     """
     last_err: Optional[str] = None
 
     for attempt in range(retries + 1):
-        sys = sys_base + _error_addendum(last_err)
+        sys = sys_base + _error_addendum(last_err) if last_err is not None else sys_base
         try:
-            output_message = llm.call(
-                messages=[
-                    {"role": "system", "content": sys},
-                    {"role": "user", "content": user_base},
-                ]
-            )
-            # print("LLM Output:", output_message)
+            messages = [
+                {"role": "system", "content": sys},
+                {"role": "user", "content": user_base},
+            ]
+            if attempt > 0 and hedge_after_sec > 0:
+                output_message = _hedged_call(llm, messages, hedge_after_sec)
+            else:
+                output_message = llm.call(messages=messages)
             # 1) Extract JSON substring
             raw_json = extract_json_fn(output_message)
 
             # 2) Parse JSON
-            data = json.loads(raw_json)
+            try:
+                data = json_loads(raw_json)
+            except json.JSONDecodeError:
+                # the brace-to-brace slice may include trailing text; decode just the first object
+                data = decode_first_json_object(output_message)
 
             # 3) Validate / coerce with Pydantic
             #    - enforce required-but-nullable fields
             data = ensure_defaults_fn(data, schema_model)
 
-            # 4) Sanitize business rules
-            clean_data = sanitize_fn(data, empty_string_for_scalars=False)
-
-            # 5) Post-filter deadlines (example rule you already use)
-            clean_data["deadlines"] = [
-                d for d in clean_data.get("deadlines", [])
-                if contains_date_fn(d.get("date", ""))
-            ]
+            # 4) Sanitize business rules; deadlines without a date are dropped in the same pass
+            # `data` is the fresh dict built by ensure_defaults_fn, so it can be normalized in place
+            clean_data = sanitize_fn(data, empty_string_for_scalars=False, date_filter=contains_date_fn,
+                                     inplace=True)
 
             # Success!
             return clean_data, None
@@ -71,10 +105,10 @@ def invoke_with_retries(
             last_err = "Schema validation error(s): " + "; ".join(errs) + more
         except Exception as e:
             last_err = f"Unexpected error: {type(e).__name__}: {e}"
-        print(f"Attempt {attempt + 1} failed: {last_err}")
+        logger.warning("Attempt %d failed: %s", attempt + 1, last_err)
         # retry if we still have attempts left
         if attempt < retries:
-            time.sleep(backoff_sec * (attempt + 1))
+            time.sleep(backoff_sec * (2 ** attempt) * (0.5 + random.random()))
 
     # All attempts failed
     return None, last_err
\ No newline at end of file
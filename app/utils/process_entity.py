@@ -1,15 +1,67 @@
-from typing import Any, Dict, List, Union, Optional, Tuple
+from typing import Any, Callable, Dict, List, Union, Optional, Tuple
+import os
 import re
 import json
+import string
+import unicodedata
 from email.utils import parseaddr
-from copy import deepcopy
-# v2 exports the sentinel via pydantic.fields
-from pydantic.fields import PydanticUndefined
-from app.domain.common import defaults_none, EMAIL_RE, PHONE_RE, WS, MISSING_TOKENS, _DATE_REGEX
+from functools import lru_cache
+import threading
+from dateutil.parser import parse as parse_date
+from app.domain.common import defaults_none, EMAIL_RE, EMAIL_OR_PHONE_RE, _MISSING_CHECK, _DATE_REGEX
 import logging
 # Initialize global objects
 logger = logging.getLogger(__name__)
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+    logger.debug("Optional hyperscan module not installed, date scanning falls back to re.")
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+    logger.debug("Optional pyahocorasick module not installed, evidence checks use per-needle substring tests.")
+
+# Below this many candidates per chunk, building an automaton (or a combined alternation)
+# costs more than the `in` tests it saves
+AHOCORASICK_MIN_NEEDLES = int(os.getenv("AHOCORASICK_MIN_NEEDLES", 8))
+
+# Patterns used per contact/deadline, compiled once
+_NON_DIGIT_PLUS = re.compile(r"[^\d+]")
+_INNER_PLUS = re.compile(r"(?<!^)\+")
+_LEAD_PLUS_ZEROS = re.compile(r"^\+0+")
+_NAME_SEP = re.compile(r"[._-]+")
+_DIGITS = re.compile(r"\d+")
+
+class _KeepDigitsTable(dict):
+    """str.translate table deleting everything but decimal digits, matching re's \\d."""
+    def __missing__(self, cp: int):
+        self[cp] = cp if chr(cp).isdecimal() else None
+        return self[cp]
+
+_KEEP_DIGITS_TBL = _KeepDigitsTable()
+
+# defaults_none is never rebound, so its items are snapshotted once for sanitize_llm_extraction
+_DEFAULTS_NONE_ITEMS = tuple(defaults_none.items())
+
+# Without any of these, parseaddr() yields no display name and no valid address,
+# so the RFC 822 parse can be skipped
+_ADDR_SYNTAX = frozenset('@<(":')
+# Plain "Display Name <addr>"; names with quotes/comments/groups are left to parseaddr
+_NAME_EMAIL_RE = re.compile(r"^\s*(?P<name>[^<>\"(),;:@\\\[\]]*?)\s*<\s*(?P<email>[^<>\s]+)\s*>\s*$")
+
+def _split_name_email(s: str) -> Tuple[str, str]:
+    """parseaddr() for the shapes LLMs actually emit, with parseaddr as the fallback."""
+    if EMAIL_RE.fullmatch(s):
+        return "", s
+    m = _NAME_EMAIL_RE.match(s)
+    if m and EMAIL_RE.fullmatch(m["email"]):
+        return m["name"], m["email"]
+    return parseaddr(s)
+
 def _to_str_list(x: Any) -> List[str]:
     if x is None:
         return []
@@ -19,7 +71,8 @@ def _to_str_list(x: Any) -> List[str]:
         return [x.strip()] if x.strip() else []
     return []
 
-def _norm_deadlines(x: Any) -> List[Dict[str, str]]:
+def _norm_deadlines(x: Any, date_filter: Optional[Callable[[str], bool]] = None) -> List[Dict[str, str]]:
+    # date_filter (e.g. contains_date) drops non-dates during the same pass
     if x is None:
         return []
     if isinstance(x, list):
@@ -27,27 +80,37 @@ def _norm_deadlines(x: Any) -> List[Dict[str, str]]:
         for item in x:
             if isinstance(item, dict) and "date" in item and isinstance(item["date"], str):
                 d = item["date"].strip()
-                if d:
-                    out.append({"date": d})
-            elif isinstance(item, str) and item.strip():
-                out.append({"date": item.strip()})
+            elif isinstance(item, str):
+                d = item.strip()
+            else:
+                continue
+            if d and (date_filter is None or date_filter(d)):
+                out.append({"date": d})
         return out
     if isinstance(x, str) and x.strip():
-        return [{"date": x.strip()}]
+        d = x.strip()
+        if date_filter is None or date_filter(d):
+            return [{"date": d}]
     return []
 
+@lru_cache(maxsize=256)
+def _is_missing_str(s: str) -> bool:
+    # recurring tokens like "N/A" are free after the first lookup
+    return _MISSING_CHECK(s.strip().lower())
+
 def _is_missing(val: Any) -> bool:
     if val is None:
         return True
-    s = str(val).strip().lower()
-    return s in MISSING_TOKENS
+    return _is_missing_str(val if isinstance(val, str) else str(val))
 
 def _norm_email(val: Any) -> str:
     if not val:
         return ""
     addr = str(val).strip()
+    if EMAIL_RE.fullmatch(addr):
+        return addr.lower()
     # Handle "Name <email@x.com>" shoved into email field
-    _, parsed = parseaddr(addr)
+    _, parsed = _split_name_email(addr)
     addr = parsed or addr
     addr = addr.strip().lower()
     return addr if EMAIL_RE.match(addr or "") else ""
@@ -57,9 +120,9 @@ def _name_from_email(email: str) -> str:
     if not email:
         return ""
     local = email.split("@", 1)[0]
-    local = re.sub(r"[._-]+", " ", local)   # dots/underscores/hyphens -> space
-    local = re.sub(r"\d+", "", local)       # drop digits
-    local = re.sub(r"\s+", " ", local).strip()
+    local = _NAME_SEP.sub(" ", local)   # dots/underscores/hyphens -> space
+    local = _DIGITS.sub("", local)      # drop digits
+    local = " ".join(local.split())
     return local.title() if local else ""
 
 def _norm_phone(val: Any) -> str:
@@ -67,14 +130,15 @@ def _norm_phone(val: Any) -> str:
         return ""
     s = str(val)
     # keep leading + and digits only
-    s = re.sub(r"[^\d+]", "", s)
-    s = re.sub(r"(?<!^)\+", "", s)  # remove any '+' not at start
+    s = _NON_DIGIT_PLUS.sub("", s)
+    s = _INNER_PLUS.sub("", s)  # remove any '+' not at start
     # collapse leading zeros after country code if it looks like +00...
-    s = re.sub(r"^\+0+", "+", s)
+    s = _LEAD_PLUS_ZEROS.sub("+", s)
     return s
 
 def _clean_text(val: Any) -> str:
-    return re.sub(r"\s+", " ", str(val)).strip() if val is not None else ""
+    # split/join collapses whitespace in C, cheaper than a regex substitution
+    return " ".join(str(val).split()) if val is not None else ""
 
 def _dict_from_name_email_phone(name: str, title: str = "", email: str = "", phone: str = "") -> Dict[str, str]:
     name = "" if _is_missing(name) else _clean_text(name)
@@ -87,8 +151,8 @@ def _dict_from_name_email_phone(name: str, title: str = "", email: str = "", pho
         name = _name_from_email(email)
 
     # If email empty but name looks like "Name <email>" parse it
-    if not email and name:
-        parsed_name, parsed_email = parseaddr(name)
+    if not email and name and "@" in name:
+        parsed_name, parsed_email = _split_name_email(name)
         if EMAIL_RE.match(parsed_email or ""):
             name = _clean_text(parsed_name or name)
             email = parsed_email.lower()
@@ -111,7 +175,9 @@ def _parse_string_contact(s: str) -> Dict[str, str]:
         except Exception:
             pass
     # Try "Name <email>" or plain email or plain name
-    name, email = parseaddr(s)
+    if _ADDR_SYNTAX.isdisjoint(s):
+        return _dict_from_name_email_phone(name=_clean_text(s))
+    name, email = _split_name_email(s)
     email = email.lower() if EMAIL_RE.match(email or "") else ""
     name = _clean_text(name or ("" if email else s))
     if not name and email:
@@ -137,11 +203,13 @@ def _dedupe(contacts: List[Dict[str, str]]) -> List[Dict[str, str]]:
         if not c:
             continue
         # Dedup key preference: email > (name, phone) > name
-        key = (
-            f"e:{c['email']}" if c.get("email") else
-            f"np:{c.get('name','').lower()}|{re.sub(r'\\D', '', c.get('phone',''))}" if (c.get("name") and c.get("phone")) else
-            f"n:{c.get('name','').lower()}"
-        )
+        email = c.get("email")
+        if email:
+            key = ("e", email)
+        else:
+            name = c.get("name", "").lower()
+            phone = c.get("phone")
+            key = ("np", name, phone.translate(_KEEP_DIGITS_TBL)) if (name and phone) else ("n", name)
         if key not in seen:
             seen.add(key)
             out.append(c)
@@ -188,20 +256,23 @@ def _norm_criteria(x: Any) -> List[Dict[str, str]]:
     one = coerce_one(x)
     return [one] if one else []
 
-def sanitize_llm_extraction(d: Dict[str, Any], *, empty_string_for_scalars: bool = False) -> Dict[str, Any]:
+def sanitize_llm_extraction(d: Dict[str, Any], *, empty_string_for_scalars: bool = False,
+                            date_filter: Optional[Callable[[str], bool]] = None,
+                            inplace: bool = False) -> Dict[str, Any]:
     """
     Normalize an LLM JSON extraction for your RFP schema:
       - Convert nulls for list-like fields to [].
       - Coerce mixed types into the expected shapes.
       - Optionally convert null scalars to "" (off by default to avoid breaking pattern-validated fields).
+      - Optionally keep only deadlines whose date passes `date_filter`.
+    With inplace=True, `d` itself is normalized and returned (for callers that own it).
     """
-    global defaults_none
-    data = dict(d)  # shallow copy
+    data = d if inplace else dict(d)  # shallow copy unless the caller hands over ownership
 
     # Ensure keys exist; if absent, set to None so normalizers can handle them
-    defaultnones = defaults_none.copy()
-    for k, v in defaultnones.items():
-        data.setdefault(k, v)
+    for k, v in _DEFAULTS_NONE_ITEMS:
+        if k not in data:
+            data[k] = v
 
     # List-of-string fields
     data["requirements"]         = _to_str_list(data.get("requirements"))
@@ -209,7 +280,7 @@ def sanitize_llm_extraction(d: Dict[str, Any], *, empty_string_for_scalars: bool
     data["compliance_standards"] = _to_str_list(data.get("compliance_standards"))
 
     # List-of-object fields
-    data["deadlines"]            = _norm_deadlines(data.get("deadlines"))
+    data["deadlines"]            = _norm_deadlines(data.get("deadlines"), date_filter)
     data["contacts"]             = _norm_contacts(data.get("contacts"))
     data["evaluation_criteria"]  = _norm_criteria(data.get("evaluation_criteria"))
 
@@ -229,109 +300,254 @@ def sanitize_llm_extraction(d: Dict[str, Any], *, empty_string_for_scalars: bool
 
     return data
 
+class _DateFoldTable(dict):
+    """
+    str.translate table mapping, one character to one, what re's Unicode \\s, \\d and IGNORECASE
+    let _DATE_REGEX match onto the ASCII the byte-level Hyperscan scan understands:
+    spaces to " ", decimal digits to 0-9 and letters such as U+017F to the ASCII letter they fold to.
+    """
+    def __missing__(self, cp: int):
+        ch = chr(cp)
+        if ch.isspace():
+            out = " "  # includes the ASCII separators \x1c-\x1f, which re's \s matches
+        elif cp < 128:
+            out = cp
+        elif ch.isdecimal():
+            out = str(unicodedata.decimal(ch))
+        else:
+            out = next((a for a in string.ascii_lowercase if re.fullmatch(a, ch, re.IGNORECASE)), cp)
+        self[cp] = out
+        return out
+
+_DATE_FOLD_TBL = _DateFoldTable()
+
+def _build_date_db():
+    """
+    Compile _DATE_REGEX into a Hyperscan DFA database used as a pre-filter, or None when unavailable.
+    Hyperscan rejects \\b in Unicode (UCP) mode, so the boundaries are dropped and the text is folded
+    with _DATE_FOLD_TBL instead: the database then matches wherever _DATE_REGEX can, and re confirms.
+    """
+    if hyperscan is None:
+        return None
+    # Hyperscan has no VERBOSE mode: drop comments and layout whitespace
+    pattern = "".join(re.sub(r"#.*|\s+", "", line) for line in _DATE_REGEX.pattern.splitlines())
+    pattern = pattern.replace(r"\b", "")
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[pattern.encode("utf-8")],
+            ids=[0],
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH],
+        )
+        return db
+    except Exception as e:
+        logger.warning("Unable to compile date regex with hyperscan, falling back to re: %s", e)
+        return None
+
 # Compile once at import
+_DATE_DB = _build_date_db()
+_HS_LOCAL = threading.local()
+
+def _date_scratch():
+    # Hyperscan scratch space must not be shared between concurrent scans
+    scratch = getattr(_HS_LOCAL, "scratch", None)
+    if scratch is None:
+        scratch = _HS_LOCAL.scratch = hyperscan.Scratch(_DATE_DB)
+    return scratch
+
+def _stop_on_first_match(id, start, end, flags, context):
+    context.append(id)
+    return True  # terminate the scan
+
 def contains_date(text: str) -> bool:
     """Return True if a date-like string is present, else False."""
-    return _DATE_REGEX.search(text) is not None
+    # every date form needs at least 4 characters and a digit, so skip the scan otherwise
+    if len(text) < 4 or not any(map(str.isdigit, text)):
+        return False
+    if _DATE_DB is None:
+        return _DATE_REGEX.search(text) is not None
+    found: List[int] = []
+    try:
+        _DATE_DB.scan(text.translate(_DATE_FOLD_TBL).encode("utf-8"), match_event_handler=_stop_on_first_match,
+                      context=found, scratch=_date_scratch())
+    except hyperscan.ScanTerminated:
+        pass
+    # the scan is a superset of _DATE_REGEX (no word boundaries), so text it clears has no date
+    # and only its hits pay for the re search
+    return bool(found) and _DATE_REGEX.search(text) is not None
 
 def _norm(s: str) -> str:
-    return WS.sub(" ", s).strip().lower()
-
-def _contains_literal(haystack: str, needle: str) -> bool:
-    return bool(needle) and _norm(needle) in _norm(haystack or "")
+    return " ".join(s.split()).lower()
 
-def _phones_in_text(text: str) -> set[str]:
-    return { re.sub(r"\D", "", m.group(0)) for m in PHONE_RE.finditer(text or "") }
+def _contains_literal_norm(haystack_norm: str, needle_norm: str) -> bool:
+    # both sides already went through _norm, so this is a plain substring test
+    return bool(needle_norm) and needle_norm in haystack_norm
 
-def _emails_in_text(text: str) -> set[str]:
-    return { m.group(0).lower() for m in EMAIL_RE.finditer(text or "") }
+def _present_set(haystack_norm: str, needles_norm: set) -> Optional[set]:
+    """
+    The subset of (normalized) needles occurring in haystack_norm, found with one Aho-Corasick
+    scan. Without pyahocorasick, a single combined alternation still settles the common
+    "none of them appear" case. Returns None when the answer is unknown (too few needles to pay
+    off, or the alternation matched), in which case callers test each needle with
+    _contains_literal_norm.
+    """
+    if len(needles_norm) < AHOCORASICK_MIN_NEEDLES:
+        return None
+    if ahocorasick is None:
+        # longest first, so shared prefixes are tried in the most specific order
+        alternation = "|".join(sorted((re.escape(n) for n in needles_norm if n), key=len, reverse=True))
+        if not alternation or re.search(alternation, haystack_norm) is None:
+            return set()
+        return None
+    automaton = ahocorasick.Automaton()
+    for n in needles_norm:
+        if n:
+            automaton.add_word(n, n)
+    if len(automaton) == 0:
+        return set()
+    automaton.make_automaton()
+    return {n for _, n in automaton.iter(haystack_norm)}
+
+def _contacts_in_text(text: str) -> Tuple[set, set]:
+    """Collect the (lowercased) emails and (digit-only) phones of `text` in a single scan."""
+    emails, phones = set(), set()
+    for m in EMAIL_OR_PHONE_RE.finditer(text or ""):
+        if m.lastgroup == "e":
+            emails.add(m.group(0).lower())
+        else:
+            phones.add(m.group(0).translate(_KEEP_DIGITS_TBL))
+    return emails, phones
 
 def _email_from_any(s: str) -> str:
-    _, e = parseaddr((s or "").strip())
+    s = (s or "").strip()
+    # bare (already normalized) addresses are the common case
+    _, e = _split_name_email(s)
     return e.lower()
 
-def _date_present_in_text(date_str: str, text: str) -> bool:
-    from dateutil.parser import parse
+@lru_cache(maxsize=1024)
+def _parse_date(date_str: str):
+    # the same deadline strings recur across chunks; None when unparseable
+    try:
+        return parse_date(date_str, dayfirst=True)
+    except Exception:
+        return None
 
-    for dt in _DATE_REGEX.findall(text):
-        try:
-            d1 = parse(date_str, dayfirst=True)
-            d2 = parse(dt, dayfirst=True)
-            if d1 == d2:
-                return True
-        except:
-            pass
-    return False
+def _text_dates(text: str) -> set:
+    """Parse every date-like token of `text` once."""
+    return {d for d in map(_parse_date, _DATE_REGEX.findall(text)) if d is not None}
 
 def _canon_contact_key(c: Dict[str, Any]) -> str:
     email = _email_from_any(c.get("email") or "")
     if email: return f"e:{email}"
     name = (c.get("name") or "").strip().lower()
-    phone = re.sub(r"\D", "", c.get("phone") or "")
+    phone = (c.get("phone") or "").translate(_KEEP_DIGITS_TBL)
     return f"np:{name}|{phone}"
 
-def filter_with_prev_backup(
-    payload: Dict[str, Any],
-    chunk_text: str,
-    prev_clean: Optional[Dict[str, Any]] = None
-) -> Tuple[Dict[str, Any], List[str]]:
+def _prepare_merge(merged: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Keep everything previously verified in prev_clean.
-    From the current payload, accept ONLY values literally present in chunk_text.
-    Returns (merged_clean, log).
+    Normalize the list fields of a (privately owned) trusted state in place and build the
+    dedup indexes used while merging chunk payloads into it.
     """
-    log: List[str] = []
-    prev = deepcopy(prev_clean or {})
-    merged = deepcopy(prev)  # start from previous trusted state
-    text = chunk_text or ""
-    # print("Chunk:", text)
-    text_norm = _norm(text)
-
-    # --- document_id: preserve from prev or payload; do not verify against text
-    if "document_id" in payload and "document_id" not in merged:
-        merged["document_id"] = payload["document_id"]
-
-    # --- document_type: update only if token appears; else keep prev
+    merged["deadlines"] = list(merged.get("deadlines") or [])
+    # contact records are upgraded in place while merging, so each gets its own (flat) copy;
+    # the list is rebuilt from the index so it is canonical even when no chunk adds a contact
+    contacts = { _canon_contact_key(c): dict(c) for c in (merged.get("contacts") or []) }
+    merged["contacts"] = list(contacts.values())
+    # criteria without usable text are dropped from the trusted state
+    merged["evaluation_criteria"] = [
+        it for it in (merged.get("evaluation_criteria") or [])
+        if isinstance(it.get("criterion") if isinstance(it, dict) else it, str)
+    ]
+    for field in ("requirements", "keywords", "compliance_standards"):
+        merged[field] = list(merged.get(field) or [])
+
+    def _norms(items):
+        return {_norm(t) for t in items if isinstance(t, str)}
+
+    return {
+        # raw string -> _norm(string), shared by every chunk of the batch
+        "norm_memo": {},
+        "deadlines": {(d.get("date"), (d.get("kind") or None)) for d in merged["deadlines"]},
+        "contacts": contacts,
+        # set when a merged contact's key no longer matches _canon_contact_key of its record
+        "contacts_stale": False,
+        "evaluation_criteria": _norms(it.get("criterion") if isinstance(it, dict) else it
+                                      for it in merged["evaluation_criteria"]),
+        "requirements": _norms(merged["requirements"]),
+        "keywords": _norms(merged["keywords"]),
+        "compliance_standards": _norms(merged["compliance_standards"]),
+    }
+
+def _criterion_text(it: Any) -> Any:
+    return it.get("criterion") if isinstance(it, dict) else it
+
+def _identity(x: Any) -> Any:
+    return x
+
+# (field, log label, candidate -> evidence string), in merge order; criteria are str or {"criterion": "..."}
+_UNION_FIELDS = (
+    ("evaluation_criteria", "evaluation_criterion", _criterion_text),
+    ("requirements", "requirement", _identity),
+    ("keywords", "keyword", _identity),
+    ("compliance_standards", "compliance_standard", _identity),
+)
+
+_DOC_TYPE_TOKENS = {
+    "RFP": ("rfp", "request for proposal"),
+    "RFI": ("rfi", "request for information"),
+    "RFQ": ("rfq", "request for quotation", "request for quote"),
+    "Sources Sought": ("sources sought",),
+    "Other": (),  # no reliable tokens; ignore unless literally 'other' appears
+}
+
+_SCALAR_FIELDS = (
+    "document_title","issue_date","client_organization","client_industry",
+    "project_scope","contract_term","submission_method","pricing_structure"
+)
+
+# The per-field helpers below take their state as explicit arguments (fast locals, no closures).
+def _memo_norm(memo: Dict[str, str], s: str) -> str:
+    k = memo.get(s)
+    if k is None:
+        k = memo[s] = _norm(s)
+    return k
+
+def _merge_document_type(merged, payload, text_norm: str, log: List[str]) -> None:
+    # update only if token appears; else keep prev
     dt_prev = merged.get("document_type")
     dt_new = payload.get("document_type")
     if dt_new and dt_new != dt_prev:
-        tokens = {
-            "RFP": ["rfp", "request for proposal"],
-            "RFI": ["rfi", "request for information"],
-            "RFQ": ["rfq", "request for quotation", "request for quote"],
-            "Sources Sought": ["sources sought"],
-            "Other": []  # no reliable tokens; ignore unless literally 'other' appears
-        }
-        if any(tok in text_norm for tok in tokens.get(dt_new, [])) or (dt_new.lower() == "other" and "other" in text_norm):
+        if any(tok in text_norm for tok in _DOC_TYPE_TOKENS.get(dt_new, ())) or (dt_new.lower() == "other" and "other" in text_norm):
             merged["document_type"] = dt_new
             log.append(f"SET document_type from chunk: {dt_new!r}")
         else:
             log.append(f"KEEP previous document_type (new not evidenced): {dt_prev!r}")
 
-    # --- scalar fields: prefer prev; only accept new if literal in chunk
-    scalar_fields = [
-        "document_title","issue_date","client_organization","client_industry",
-        "project_scope","contract_term","submission_method","pricing_structure"
-    ]
-    for f in scalar_fields:
+def _merge_scalars(merged, payload, text_norm: str, text_dates: set, memo: Dict[str, str], log: List[str]) -> None:
+    # prefer prev; only accept new if literal in chunk
+    for f in _SCALAR_FIELDS:
         prev_val = merged.get(f)
         cand = payload.get(f)
         if cand is None or cand == "" or cand == prev_val:
             continue
-        ok = _date_present_in_text(cand, text) if f == "issue_date" else _contains_literal(text, str(cand))
+        if f == "issue_date":
+            ok = _parse_date(str(cand)) in text_dates
+        else:
+            ok = _contains_literal_norm(text_norm, _memo_norm(memo, str(cand)))
         if ok:
             merged[f] = cand
             log.append(f"SET {f} from chunk: {cand!r}")
         else:
             log.append(f"KEEP previous {f} (new not evidenced): {prev_val!r}")
 
-    # --- deadlines: union(prev, new_in_chunk); dedupe by (date, kind)
-    prev_dead = {(d.get("date"), (d.get("kind") or None)) for d in (prev.get("deadlines") or [])}
-    merged_dead = list(prev.get("deadlines") or [])
+def _merge_deadlines(merged, index, payload, text_dates: set, log: List[str]) -> None:
+    # union(prev, new_in_chunk); dedupe by (date, kind)
+    prev_dead = index["deadlines"]
+    merged_dead = merged["deadlines"]
     for d in (payload.get("deadlines") or []):
         date_s = (d or {}).get("date")
         kind = (d or {}).get("kind") or None
-        if date_s and _date_present_in_text(str(date_s), text):
+        if date_s and _parse_date(str(date_s)) in text_dates:
             key = (date_s, kind)
             if key not in prev_dead:
                 merged_dead.append({"date": date_s, **({"kind": kind} if kind else {})})
@@ -339,16 +555,16 @@ def filter_with_prev_backup(
                 log.append(f"ADD deadline from chunk: {key}")
         else:
             log.append(f"SKIP deadline (not evidenced): {d!r}")
-    merged["deadlines"] = merged_dead
 
-    # --- contacts: keep all prev; add/upgrade ONLY if email/phone appears in chunk
-    emails = _emails_in_text(text)
-    phones = _phones_in_text(text)
+def _merge_contacts(merged, index, contacts_new: List[Dict[str, Any]], text: str, text_norm: str,
+                    memo: Dict[str, str], log: List[str]) -> None:
+    # keep all prev; add/upgrade ONLY if email/phone appears in chunk
+    emails, phones = _contacts_in_text(text)
 
-    kept = { _canon_contact_key(c): deepcopy(c) for c in (prev.get("contacts") or []) }
-    for c in (payload.get("contacts") or []):
+    kept = index["contacts"]
+    for c in contacts_new:
         email = _email_from_any(c.get("email") or "")
-        phone = re.sub(r"\D", "", c.get("phone") or "")
+        phone = (c.get("phone") or "").translate(_KEEP_DIGITS_TBL)
         has_email = email in emails
         has_phone = phone in phones and len(phone) >= 7
         if not has_email and not has_phone:
@@ -358,72 +574,120 @@ def filter_with_prev_backup(
         base = kept.get(key, {"name": None, "title": None, "email": email or None, "phone": phone or None})
         # name must be literal in chunk; otherwise keep previous (or null)
         name_new = (c.get("name") or "").strip()
-        if name_new and _contains_literal(text, name_new):
+        if name_new and _contains_literal_norm(text_norm, _memo_norm(memo, name_new)):
             base["name"] = name_new
         # title: accept if literal; else keep prev
         title_new = (c.get("title") or "").strip()
-        if title_new and _contains_literal(text, title_new):
+        if title_new and _contains_literal_norm(text_norm, _memo_norm(memo, title_new)):
             base["title"] = title_new
         # email/phone we already verified from chunk
         if email: base["email"] = email
         if phone: base["phone"] = phone
         kept[key] = base
+        # the record may now canonicalize differently (e.g. gained an email, or its name
+        # stayed null); the next chunk re-keys the index just like a fresh _prepare_merge would
+        if _canon_contact_key(base) != key:
+            index["contacts_stale"] = True
         log.append(f"MERGE/ADD contact from chunk: {key}")
 
     merged["contacts"] = list(kept.values())
 
-    # --- evaluation_criteria: union(prev + new that appear); supports str or {"criterion": "..."}
-    prev_ec_texts = set()
-    ec_prev = []
-    for it in (prev.get("evaluation_criteria") or []):
-        s = it.get("criterion") if isinstance(it, dict) else it
-        if isinstance(s, str):
-            ec_prev.append(it)
-            prev_ec_texts.add(_norm(s))
-    ec_out = list(ec_prev)
-    for it in (payload.get("evaluation_criteria") or []):
-        s = it.get("criterion") if isinstance(it, dict) else it
-        if isinstance(s, str) and _contains_literal(text, s):
-            key = _norm(s)
-            if key not in prev_ec_texts:
-                ec_out.append(it if isinstance(it, dict) else s)
-                prev_ec_texts.add(key)
-                log.append(f"ADD evaluation_criterion from chunk: {s!r}")
+def _rekey_contacts(merged, index) -> None:
+    # same collapse as _prepare_merge: first position, last record wins per canonical key
+    contacts = {_canon_contact_key(c): c for c in merged["contacts"]}
+    index["contacts"] = contacts
+    merged["contacts"] = list(contacts.values())
+    index["contacts_stale"] = False
+
+def _stage_union_rows(payload, memo: Dict[str, str]) -> List[Tuple[str, str, List[Tuple[Any, Any, str]]]]:
+    # (field, label, [(item, evidence string, normalized needle)]) for every non-empty list field
+    staged = []
+    for field, label, extract in _UNION_FIELDS:
+        items = payload.get(field)
+        if items:
+            rows = []
+            for item in items:
+                s = extract(item)
+                rows.append((item, s, _memo_norm(memo, s) if isinstance(s, str) else ""))
+            staged.append((field, label, rows))
+    return staged
+
+def _union_field(merged, index, field: str, label: str, rows, present: Optional[set],
+                 text_norm: str, log: List[str]) -> None:
+    # union(prev + new that appear)
+    prev_norms = index[field]
+    out = merged[field]
+    for item, s, k in rows:
+        if (k in present) if present is not None else _contains_literal_norm(text_norm, k):
+            if k not in prev_norms:
+                out.append(item)
+                prev_norms.add(k)
+                log.append(f"ADD {label} from chunk: {s!r}")
         else:
-            log.append(f"SKIP evaluation_criterion (not evidenced): {s!r}")
-    merged["evaluation_criteria"] = ec_out
-
-    # --- requirements: union(prev + new that appear)
-    prev_req = {_norm(r) for r in (prev.get("requirements") or []) if isinstance(r, str)}
-    req_out = list(prev.get("requirements") or [])
-    for r in (payload.get("requirements") or []):
-        if isinstance(r, str) and _contains_literal(text, r):
-            k = _norm(r)
-            if k not in prev_req:
-                req_out.append(r)
-                prev_req.add(k)
-                log.append(f"ADD requirement from chunk: {r!r}")
-        else:
-            log.append(f"SKIP requirement (not evidenced): {r!r}")
-    merged["requirements"] = req_out
-
-    # --- key_technologies / compliance_standards: union(prev + new tokens that appear)
-    def _union_tokens(field: str):
-        prev_tokens = {_norm(t) for t in (prev.get(field) or []) if isinstance(t, str)}
-        out = list(prev.get(field) or [])
-        for t in (payload.get(field) or []):
-            if isinstance(t, str) and _contains_literal(text, t):
-                k = _norm(t)
-                if k not in prev_tokens:
-                    out.append(t)
-                    prev_tokens.add(k)
-                    log.append(f"ADD {field[:-1]} from chunk: {t!r}")
-            else:
-                log.append(f"SKIP {field[:-1]} (not evidenced): {t!r}")
-        merged[field] = out
+            log.append(f"SKIP {label} (not evidenced): {s!r}")
 
-    _union_tokens("keywords")
-    _union_tokens("compliance_standards")
+def _merge_chunk(merged: Dict[str, Any], index: Dict[str, Any], payload: Dict[str, Any],
+                 chunk_text: str, log: List[str]) -> None:
+    """
+    Merge one chunk payload into `merged` in place, accepting ONLY values literally present
+    in chunk_text. `index` (from _prepare_merge) is updated with every accepted item.
+    """
+    if index["contacts_stale"]:
+        _rekey_contacts(merged, index)
+    text = chunk_text or ""
+    # print("Chunk:", text)
+    text_norm = _norm(text)
+    memo = index["norm_memo"]
+    # the chunk's dates are parsed only when a date candidate needs checking
+    issue_date = payload.get("issue_date")
+    needs_dates = payload.get("deadlines") or (issue_date not in (None, "") and issue_date != merged.get("issue_date"))
+    text_dates = _text_dates(text) if needs_dates else set()
 
-    return merged, log
+    # --- document_id: preserve from prev or payload; do not verify against text
+    if "document_id" in payload and "document_id" not in merged:
+        merged["document_id"] = payload["document_id"]
+
+    _merge_document_type(merged, payload, text_norm, log)
+    _merge_scalars(merged, payload, text_norm, text_dates, memo, log)
+    _merge_deadlines(merged, index, payload, text_dates, log)
 
+    # (the email/phone scans over the whole chunk are skipped when the payload has no contacts)
+    contacts_new = payload.get("contacts") or []
+    if contacts_new:
+        _merge_contacts(merged, index, contacts_new, text, text_norm, memo, log)
+
+    # --- list fields: every candidate of every field is located in a single pass over the text when possible
+    staged = _stage_union_rows(payload, memo)
+    present = _present_set(text_norm, {k for _, _, rows in staged for _, _, k in rows}) if staged else None
+    for field, label, rows in staged:
+        _union_field(merged, index, field, label, rows, present, text_norm, log)
+
+def filter_with_prev_backup(
+    payload: Dict[str, Any],
+    chunk_text: str,
+    prev_clean: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Keep everything previously verified in prev_clean.
+    From the current payload, accept ONLY values literally present in chunk_text.
+    Returns (merged_clean, log).
+    """
+    return filter_batch_with_prev_backup([(payload, chunk_text)], prev_clean=prev_clean)
+
+def filter_batch_with_prev_backup(
+    items: List[Tuple[Dict[str, Any], str]],
+    prev_clean: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Equivalent to folding filter_with_prev_backup over `items` ((payload, chunk_text) pairs, in order),
+    but the previous state is copied and its dedup sets are built once for the whole batch.
+    Returns (merged_clean, log).
+    """
+    log: List[str] = []
+    # start from previous trusted state; _prepare_merge copies every list the merge appends to,
+    # so a shallow copy is enough to leave prev_clean untouched
+    merged = dict(prev_clean or {})
+    index = _prepare_merge(merged)
+    for payload, chunk_text in items:
+        _merge_chunk(merged, index, payload, chunk_text, log)
+    return merged, log
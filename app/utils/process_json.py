@@ -1,5 +1,6 @@
 import json
-from typing import  Dict, Any, List, Type
+from functools import lru_cache
+from typing import  Dict, Any, List, Type, Tuple, Optional, Callable
 from pydantic import BaseModel, ValidationError
 from pydantic.fields import PydanticUndefined
 from app.domain.common import _LIST_FIELDS, _STRING_FIELD
@@ -7,8 +8,33 @@ import logging
 # Initialize global objects
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.debug("Optional orjson module not installed, using the standard json module.")
+
+# ---------- Fast JSON helpers (orjson with stdlib fallback) ----------
+def json_loads(data: str | bytes) -> Any:
+    """Deserialize JSON text; orjson errors subclass json.JSONDecodeError."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any) -> str:
+    """Serialize to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def json_dumps_pretty(obj: Any) -> str:
+    """Serialize to 2-space indented JSON for logs; values JSON can't represent are rendered with str()."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=str)
+
 # ---------- Validation tool (used by agents & pipeline) ----------
-def validate_extraction_json(model: BaseModel, payload: Dict[str, Any]) -> Dict[str, Any]:
+def validate_extraction_json(model: Type[BaseModel], payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         valid = model.model_validate(payload)  # Pydantic v2
         return {"ok": True, "data": valid.model_dump()}
@@ -19,28 +45,46 @@ def extract_json_between_braces(text_with_json):
     """
     Extracts the JSON object from a string that contains other text.
     Assumes the JSON starts with the first '{' and ends with the last '}'.
+    The slice is not parsed here; callers decode it right after.
     """
-    try:
-        # Find the index of the first opening curly brace
-        start_index = text_with_json.find('{')
-        # Find the index of the last closing curly brace
-        end_index = text_with_json.rfind('}')
-
-        if start_index == -1 or end_index == -1:
-            raise ValueError("No valid JSON object found in the text.")
-
-        # Slice the string to get the potential JSON content
-        json_string = text_with_json[start_index : end_index + 1]
-        
-        # Attempt to parse the extracted string to validate it
-        # data = json.loads(json_string)
-        return json_string
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Extracted string is not valid JSON: {e}")
-    except Exception as e:
-        raise ValueError(f"Error extracting JSON: {e}")
+    if not isinstance(text_with_json, str):
+        raise ValueError(f"Error extracting JSON: expected str, got {type(text_with_json).__name__}")
+    # Fast path: the model returned a bare object, no scanning needed
+    stripped = text_with_json.strip()
+    if stripped[:1] == "{" and stripped[-1:] == "}":
+        return stripped
+
+    # Find the index of the first opening curly brace
+    start_index = text_with_json.find('{')
+    # Find the index of the last closing curly brace after it
+    end_index = text_with_json.rfind('}', start_index + 1) if start_index != -1 else -1
+    if start_index == -1 or end_index == -1:
+        raise ValueError("No valid JSON object found in the text.")
+
+    # Slice the string to get the potential JSON content
+    return text_with_json[start_index : end_index + 1]
+
+_JSON_DECODER = json.JSONDecoder()
+
+def decode_first_json_object(text: str) -> Any:
+    """
+    Decodes the JSON value starting at the first '{' and ignores whatever follows it.
+    The C decoder locates the end of the object itself, which recovers responses where
+    the first-'{'-to-last-'}' slice is not valid JSON (e.g. trailing prose with braces).
+    Raises json.JSONDecodeError if no valid object starts there.
+    """
+    obj, _ = _JSON_DECODER.raw_decode(text, max(text.find("{"), 0))
+    return obj
 
 # ---------- Merge tool ----------
+def _canon(x: Any) -> Any:
+    """Hashable, order-insensitive (for dict keys) stand-in for a JSON value, used as a dedup key."""
+    if isinstance(x, dict):
+        return frozenset((k, _canon(v)) for k, v in x.items())
+    if isinstance(x, list):
+        return tuple(_canon(v) for v in x)
+    return x
+
 def merge_chunk_jsons(model: BaseModel, json_list: List[Dict[str, Any]]) -> Dict[str, Any]:
     merged = model.model_dump()
 
@@ -58,7 +102,7 @@ def merge_chunk_jsons(model: BaseModel, json_list: List[Dict[str, Any]]) -> Dict
         seen, out = set(), []
         for j in json_list:
             for item in j.get(key, []):
-                k = json.dumps(item, sort_keys=True)
+                k = _canon(item)
                 if k not in seen:
                     seen.add(k); out.append(item)
         return out
@@ -68,21 +112,38 @@ def merge_chunk_jsons(model: BaseModel, json_list: List[Dict[str, Any]]) -> Dict
 
     return merged
 
-def unresolved_fields(prev_state: Dict) -> List[str]:
+def _is_unresolved(v: Any) -> bool:
     # consider null/""/[] as unresolved
-    unresolved = []
-    for k, v in prev_state.items():
-        if v is None or v == "" or v == []:
-            unresolved.append(k)
-    return unresolved
+    return v is None or v == "" or v == []
+
+def unresolved_fields(prev_state: Dict) -> List[str]:
+    return [k for k, v in prev_state.items() if _is_unresolved(v)]
+
+def prune_resolved(unresolved: List[str], state: Dict) -> List[str]:
+    """
+    Drop the fields of `unresolved` that now hold a value in `state`.
+    Merges never clear a field, so only the still-unresolved keys need re-checking
+    instead of rescanning the whole state; the original field order is kept.
+    """
+    return [k for k in unresolved if _is_unresolved(state.get(k))]
 
 def update_prev_chunk(prev_chunk: Dict[str, Any], new_chunk: Dict[str, Any]) -> Dict[str, Any]:
     for key in prev_chunk.keys():
         if isinstance(prev_chunk[key], list) and isinstance(new_chunk.get(key), list):
-            prev_chunk[key].extend(new_chunk[key])
-            # Remove duplicates while preserving order
-            seen = set()
-            prev_chunk[key] = [x for x in prev_chunk[key] if not (json.dumps(x, sort_keys=True) in seen or seen.add(json.dumps(x, sort_keys=True)))]
+            # Remove duplicates while preserving order; the existing items seed `seen`,
+            # so each item is canonicalized exactly once
+            seen, out = set(), []
+            for x in prev_chunk[key]:
+                k = _canon(x)
+                if k not in seen:
+                    seen.add(k)
+                    out.append(x)
+            for x in new_chunk[key]:
+                k = _canon(x)
+                if k not in seen:
+                    seen.add(k)
+                    out.append(x)
+            prev_chunk[key] = out
         elif isinstance(prev_chunk[key], str) and isinstance(new_chunk.get(key), str):
             if new_chunk[key].strip() and new_chunk[key] not in prev_chunk[key]:
                 if prev_chunk[key].strip():
@@ -91,22 +152,35 @@ def update_prev_chunk(prev_chunk: Dict[str, Any], new_chunk: Dict[str, Any]) ->
                     prev_chunk[key] = new_chunk[key]
     return prev_chunk
 
+@lru_cache(maxsize=None)
+def _defaults_template(model_cls) -> Tuple[Tuple[str, Any, Optional[Callable[[], Any]]], ...]:
+    # model_fields reflection runs once per model class: (name, default, default_factory)
+    out = []
+    for name, fld in model_cls.model_fields.items():
+        # fld is FieldInfo (v2)
+        if fld.default is not PydanticUndefined:
+            out.append((name, fld.default, None))
+        elif fld.default_factory is not None:
+            out.append((name, None, fld.default_factory))
+        else:
+            out.append((name, None, None))
+    return tuple(out)
+
 def _defaults_from_model(model_cls) -> Dict[str, Any]:
     """
     Build default dict from a Pydantic v2 model:
-    - use field.default when set
+    - use field.default when set (mutable defaults are copied, never shared between calls)
     - call field.default_factory() when present
     - otherwise use None
     """
     out: Dict[str, Any] = {}
-    for name, fld in model_cls.model_fields.items():
-        # fld is FieldInfo (v2)
-        if fld.default is not PydanticUndefined:
-            out[name] = fld.default
-        elif fld.default_factory is not None:
-            out[name] = fld.default_factory()  # zero-arg or v2-style callable
+    for name, default, factory in _defaults_template(model_cls):
+        if factory is not None:
+            out[name] = factory()  # zero-arg or v2-style callable
+        elif isinstance(default, (list, dict)):
+            out[name] = default.copy()
         else:
-            out[name] = None
+            out[name] = default
     return out
 
 def ensure_defaults(payload: Dict[str, Any], model_cls: Type[BaseModel]) -> Dict[str, Any]:
@@ -116,14 +190,17 @@ def ensure_defaults(payload: Dict[str, Any], model_cls: Type[BaseModel]) -> Dict
       - For list fields, convert None to [] (and non-lists to [] for safety).
       - Leave scalar fields (e.g., issue_date) as-is, even if None.
     """
-    BASE_DEFAULTS = _defaults_from_model(model_cls)
-    out = dict(BASE_DEFAULTS)              # start with defaults
-    out.update({k: v for k, v in payload.items() if k in BASE_DEFAULTS})  # overlay known keys
+    # start with defaults and overlay known keys; the result is keyed by the model's own
+    # (interned) field-name strings rather than the key objects the JSON decoder produced
+    out = _defaults_from_model(model_cls)
+    for k in out:
+        if k in payload:
+            out[k] = payload[k]
 
     # normalize list fields
     for fld in _LIST_FIELDS:
-        v = out.get(fld, [])
-        out[fld] = v if isinstance(v, list) and v is not None else ([] if v is None or not isinstance(v, list) else v)
+        if not isinstance(out.get(fld), list):
+            out[fld] = []
 
     return out
 
@@ -136,55 +213,58 @@ def ingest_json_results_to_blob(result_content):
     """
     try:
         # Load the JSON data
-        data = json.loads(result_content) if isinstance(result_content, str) else result_content
+        data = json_loads(result_content) if isinstance(result_content, str) else result_content
 
         # Smarter sorting: by page, then structured objects by x0, y0
         def sorting_key(entry):
-            page = entry["metadata"]["content_metadata"].get("page_number", -1)
+            md = entry.get("metadata")
+            page = md["content_metadata"].get("page_number", -1)
             if entry["document_type"] == "structured":
                 # Use table location's x0 and y0 as secondary keys
-                x0 = entry["metadata"]["table_metadata"]["table_location"][0]
-                y0 = entry["metadata"]["table_metadata"]["table_location"][1]
+                loc = md["table_metadata"]["table_location"]
+                x0, y0 = loc[0], loc[1]
             else:
                 # Non-structured objects are sorted after structured ones
                 x0 = float("inf")
                 y0 = float("inf")
             return page, x0, y0
 
-        sorted_data = sorted(data, key=sorting_key)
+        if len(data) > 1:
+            if isinstance(result_content, str):
+                data.sort(key=sorting_key)  # freshly parsed list, safe to sort in place
+            else:
+                data = sorted(data, key=sorting_key)
 
         # Initialize the blob string
         blob = []
         metadatas = []
-        for entry in sorted_data:
-            meta = {}
+        append = blob.append
+        for entry in data:
             document_type = entry.get("document_type", "")
+            md = entry.get("metadata")
 
             if document_type == "structured":
                 # Add table content to the blob
-                blob.append(entry["metadata"]["table_metadata"]["table_content"])
-                blob.append("\n")
+                append(md["table_metadata"]["table_content"] + "\n")
 
             elif document_type == "text":
                 # Add content to the blob
-                blob.append(entry["metadata"].get("content", ""))
-                blob.append("\n")
-                meta['source'] = entry['metadata']['source_metadata'].get('source_id', '')
-                meta['content_metadata']={'source_type': entry['metadata']['source_metadata'].get('source_type', ''),
-                                          'content_metadata': entry['metadata'].get('content_metadata', {})}
+                append(md.get("content", "") + "\n")
+                source_md = md['source_metadata']
+                metadatas.append({
+                    'source': source_md.get('source_id', ''),
+                    'content_metadata': {'source_type': source_md.get('source_type', ''),
+                                         'content_metadata': md.get('content_metadata', {})},
+                })
                 # meta['content_metadata']['page_number'] = entry['metadata']['content_metadata']['hierarchy'].get('page', -1)
-                metadatas.append(meta)
 
             elif document_type == "image":
                 # Add image caption to the blob
-                caption = entry["metadata"]["image_metadata"].get("caption", "")
-                blob.append(f"image_caption:[{caption}]")
-                blob.append("\n")
+                caption = md["image_metadata"].get("caption", "")
+                append(f"image_caption:[{caption}]\n")
 
             elif document_type == "audio":
-                blob.append(entry["metadata"]["audio_metadata"]["audio_transcript"])
-                blob.append("\n")
-            
+                append(md["audio_metadata"]["audio_transcript"] + "\n")
 
         # Join all parts of the blob into a single string
         return "".join(blob), metadatas
@@ -0,0 +1,98 @@
+import hashlib
+from typing import Any, Dict, List, Optional, Set
+import logging
+# Initialize global objects
+logger = logging.getLogger(__name__)
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+    logger.debug("Optional xxhash module not installed, using hashlib.blake2b for chunk fingerprints.")
+
+_SHINGLE_SIZE = 5
+_SIMHASH_BITS = 64
+# a Hamming distance <= 3 over 64 bits leaves at least one of 4 16-bit bands identical
+_BANDS = 4
+_BAND_BITS = _SIMHASH_BITS // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+# ---------- Chunk fingerprints ----------
+def _hash64(data: bytes) -> int:
+    if xxhash is not None:
+        return xxhash.xxh64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+def text_fingerprint(text: str) -> int:
+    """64-bit hash of the whitespace-normalized text, for exact duplicate detection."""
+    return _hash64(" ".join(text.split()).encode("utf-8"))
+
+def simhash(text: str, shingle_size: int = _SHINGLE_SIZE) -> int:
+    """64-bit SimHash over lowercased word shingles."""
+    tokens = text.lower().split()
+    if len(tokens) <= shingle_size:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)}
+    weights = [0] * _SIMHASH_BITS
+    for sh in shingles:
+        h = _hash64(sh.encode("utf-8"))
+        for bit in range(_SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    out = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            out |= 1 << bit
+    return out
+
+def dedupe_documents(documents: List[Any], seen: Optional[Set[int]] = None) -> List[Any]:
+    """
+    Drops documents whose page_content repeats an earlier one, keeping first occurrences in order.
+    Keys are 64-bit content hashes, so only ints are held in the seen-set.
+    Pass the same `seen` set across calls to dedupe a stream handed over in batches.
+    """
+    if seen is None:
+        seen = set()
+    out = []
+    for doc in documents:
+        key = _hash64(doc.page_content.encode("utf-8"))
+        if key not in seen:
+            seen.add(key)
+            out.append(doc)
+    return out
+
+class ChunkDeduper:
+    """
+    Remembers the chunks seen so far and flags exact or near-duplicate text
+    (repeated headers, footers, per-page boilerplate).
+    Near duplicates are found through banded lookups on the SimHash, so each check
+    only compares against candidates sharing a band instead of every prior chunk.
+    Near-duplicate detection is off by default: it also flags chunks that differ only
+    in a date, name or phone number.
+    """
+    def __init__(self, near_duplicates: bool = False, max_hamming: int = 3):
+        self.near_duplicates = near_duplicates
+        self.max_hamming = max_hamming
+        self._seen: Set[int] = set()
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(_BANDS)]
+
+    def is_duplicate(self, text: str) -> bool:
+        """Returns True if `text` repeats a prior chunk; otherwise records it and returns False."""
+        fp = text_fingerprint(text)
+        if fp in self._seen:
+            return True
+        self._seen.add(fp)
+        if not self.near_duplicates:
+            return False
+        sig = simhash(text)
+        keys = [(sig >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS)]
+        if self.max_hamming < _BANDS:
+            candidates = (other for band, key in zip(self._bands, keys) for other in band.get(key, ()))
+        else:
+            # banding no longer guarantees a shared band, compare against everything
+            candidates = (o for b in self._bands[0].values() for o in b)
+        if any((sig ^ other).bit_count() <= self.max_hamming for other in candidates):
+            return True
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(sig)
+        return False
@@ -1,21 +1,38 @@
 import json
-from typing import Optional
-from app.domain.common import SYSTEM_PROMPT, USER_PROMPT, ERROR_PROMPT
+import hashlib
+from types import MappingProxyType
+from typing import Mapping, Optional
+from app.domain.common import SYSTEM_PROMPT, USER_PROMPT, ERROR_PROMPT, OUTPUT_SCHEMA
 import logging
 # Initialize global objects
 logger = logging.getLogger(__name__)
 
-def build_system_prompt(schema: dict) -> str:
-    return SYSTEM_PROMPT.format(schema_json=json.dumps(schema, ensure_ascii=False))
+def _format_system_prompt(schema: Mapping) -> str:
+    return SYSTEM_PROMPT.format(schema_json=json.dumps(dict(schema), ensure_ascii=False, separators=(",", ":")))
 
-def build_user_prompt(prev_state: dict, chunk_text: str, unresolved_hint: list[str] | None = None) -> str:
+# The default schema never changes, so render its prompt once at import
+_SYS_PROMPT_CACHED = _format_system_prompt(OUTPUT_SCHEMA)
+# Changes whenever the prompt templates or the schema change; part of the LLM extraction cache key
+PROMPT_VERSION = hashlib.blake2b((_SYS_PROMPT_CACHED + USER_PROMPT).encode("utf-8"), digest_size=8).hexdigest()
+
+def build_system_prompt(schema: Mapping) -> str:
+    # accept OUTPUT_SCHEMA itself or a read-only MappingProxyType view of it
+    if schema is OUTPUT_SCHEMA or (isinstance(schema, MappingProxyType) and schema == OUTPUT_SCHEMA):
+        return _SYS_PROMPT_CACHED
+    return _format_system_prompt(schema)
+
+def build_user_prompt(prev_state: dict, chunk_text: str, unresolved_hint: list[str] | None = None,
+                      prev_state_json: Optional[str] = None) -> str:
+    # callers issuing several prompts against the same state pass it pre-serialized
+    if prev_state_json is None:
+        prev_state_json = json.dumps(prev_state, ensure_ascii=False)
     hint = ""
     if unresolved_hint:
         hint = (
             "UNRESOLVED_FIELDS (Focus on unresolved or empty fields first (if present), but DO NOT change any field unless NEW_CHUNK explicitly supports the change.): "
             + ", ".join(unresolved_hint) + "\n\n"
         )
-    return USER_PROMPT.format(prev_state=json.dumps(prev_state, ensure_ascii=False), hint=hint, chunk_text=chunk_text)
+    return USER_PROMPT.format(prev_state=prev_state_json, hint=hint, chunk_text=chunk_text)
 
 # --- helper to append error-aware guidance to the system prompt ---
 def _error_addendum(err: Optional[str]) -> str:
@@ -16,6 +16,9 @@
 """The wrapper for interacting with milvus vectorstore and associated functions.
 1. create_vectorstore_langchain: Create the vector db index for langchain.
 2. get_vectorstore: Get the vectorstore object.
+   get_vectorstores: Get the vectorstore objects for several collections after a single existence check.
+   add_documents_batched: Embed documents in batches and insert the precomputed vectors.
+   aadd_documents_batched: Same, overlapping the embedding of one batch with the insert of the previous one.
 3. create_collections: Create multiple collections in the Milvus vector database.
 4. get_collection: Get the list of all collection in vectorstore along with the number of rows in each collection.
 5. delete_collections: Delete a list of collections from the Milvus vector database.
@@ -24,8 +27,10 @@
 
 import os
 import time
+import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 from langchain_core.documents import Document
@@ -35,7 +40,6 @@ from pymilvus.orm.types import CONSISTENCY_STRONG
 from langchain_milvus import Milvus
 from langchain_core.runnables import RunnableAssign, RunnableLambda
 from opentelemetry import context as otel_context
-from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
 from langchain_core.documents import Document
 from app.utils.common import get_config
 
@@ -44,11 +48,9 @@ logger = logging.getLogger(__name__)
 CONFIG = get_config()
 
 DEFAULT_METADATA_SCHEMA_COLLECTION = "metadata_schema"
-
-try:
-    from nv_ingest_client.util.milvus import create_nvingest_collection
-except Exception:
-    logger.debug("Optional nv_ingest_client module not installed.")
+# Texts per embed_documents request and rows per add_embeddings insert in add_documents_batched
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 128))
+INSERT_BATCH_SIZE = int(os.getenv("INSERT_BATCH_SIZE", "500"))
 
 try:
     from langchain_milvus import BM25BuiltInFunction
@@ -56,8 +58,12 @@ except ImportError:
     logger.error("langchain-milvus is not installed.")
     raise Exception("langchain-milvus is not installed.")
 
-def create_vectorstore_langchain(document_embedder, collection_name: str = "", vdb_endpoint: str = "") -> VectorStore:
-    """Create the vector db index for langchain."""
+def create_vectorstore_langchain(document_embedder, collection_name: str = "", vdb_endpoint: str = "",
+                                 existing_collections: Optional[Set[str]] = None) -> VectorStore:
+    """
+    Create the vector db index for langchain.
+    If `existing_collections` (a prior list_collections result) is given, no check RPC is made.
+    """
 
     config = get_config()
 
@@ -69,16 +75,21 @@ def create_vectorstore_langchain(document_embedder, collection_name: str = "", v
         if not collection_name:
             collection_name = os.getenv('COLLECTION_NAME', "vector_db")
 
-        # Connect to Milvus to check for collection availability
-        url = urlparse(vdb_endpoint)
-        connection_alias = f"milvus_{url.hostname}_{url.port}"
-        connections.connect(connection_alias, host=url.hostname, port=url.port)
+        if existing_collections is not None:
+            if collection_name not in existing_collections:
+                logger.debug(f"Collection '{collection_name}' does not exist in Milvus. Aborting vectorstore creation.")
+                return None
+        else:
+            # Connect to Milvus to check for collection availability
+            url = urlparse(vdb_endpoint)
+            connection_alias = f"milvus_{url.hostname}_{url.port}"
+            connections.connect(connection_alias, host=url.hostname, port=url.port)
 
-        # Check if the collection exists
-        if not utility.has_collection(collection_name, using=connection_alias):
-            logger.debug(f"Collection '{collection_name}' does not exist in Milvus. Aborting vectorstore creation.")
-            connections.disconnect(connection_alias)
-            return None
+            # Check if the collection exists
+            if not utility.has_collection(collection_name, using=connection_alias):
+                logger.debug(f"Collection '{collection_name}' does not exist in Milvus. Aborting vectorstore creation.")
+                connections.disconnect(connection_alias)
+                return None
 
         logger.debug(f"Collection '{collection_name}' exists. Proceeding with vector store creation.")
 
@@ -135,6 +146,111 @@ def get_vectorstore(
     return create_vectorstore_langchain(document_embedder, collection_name, vdb_endpoint)
 
 
+def list_collection_names(vdb_endpoint: str) -> Set[str]:
+    """Names of all collections on the server, fetched with a single list_collections call."""
+    url = urlparse(vdb_endpoint)
+    connection_alias = f"milvus_{url.hostname}_{url.port}"
+    connections.connect(connection_alias, host=url.hostname, port=url.port)
+    try:
+        return set(utility.list_collections(using=connection_alias))
+    finally:
+        connections.disconnect(connection_alias)
+
+
+def get_vectorstores(document_embedder, collections: Dict[str, str], vdb_endpoint: str = "",
+                     existing_collections: Optional[Set[str]] = None) -> Dict[str, VectorStore]:
+    """
+    Returns {key: vectorstore} for every collection in `collections` ({key: collection_name}).
+    Existence is checked for all of them with one list_collections call (skipped when the caller
+    already has the names, e.g. from init_collection), then the langchain handles (which describe
+    their collection on creation) are built concurrently.
+    """
+    if not vdb_endpoint:
+        vdb_endpoint = get_config().vector_store.url
+    existing = existing_collections
+    if existing is None:
+        existing = list_collection_names(vdb_endpoint)
+    with ThreadPoolExecutor(max_workers=max(1, len(collections))) as executor:
+        futures = {
+            key: executor.submit(create_vectorstore_langchain, document_embedder, name, vdb_endpoint,
+                                 existing_collections=existing)
+            for key, name in collections.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def add_documents_batched(vectorstore: VectorStore, documents: List[Document], document_embedder=None,
+                          batch_size: int = EMBEDDING_BATCH_SIZE, insert_batch_size: int = INSERT_BATCH_SIZE) -> List[str]:
+    """
+    Embeds `documents` with `document_embedder.embed_documents` in batches of `batch_size` texts
+    and inserts the precomputed vectors through `vectorstore.add_embeddings` in batches of
+    `insert_batch_size` rows, so neither the embedder nor the database sees one request per document.
+    `document_embedder` defaults to the store's own embedding function. Falls back to `add_documents`
+    for stores without `add_embeddings` or without a single embedding function.
+    """
+    if not documents:
+        return []
+    if document_embedder is None:
+        document_embedder = getattr(vectorstore, "embeddings", None)
+    if not hasattr(vectorstore, "add_embeddings") or not hasattr(document_embedder, "embed_documents"):
+        return vectorstore.add_documents(documents)
+    batch_size = max(1, batch_size)
+    insert_batch_size = max(1, insert_batch_size)
+    ids = []
+    for i in range(0, len(documents), insert_batch_size):
+        rows = documents[i:i + insert_batch_size]
+        texts = [d.page_content for d in rows]
+        embeddings = []
+        for j in range(0, len(texts), batch_size):
+            embeddings.extend(document_embedder.embed_documents(texts[j:j + batch_size]))
+        ids.extend(vectorstore.add_embeddings(texts, embeddings, [d.metadata for d in rows]))
+    return ids
+
+async def aadd_documents_batched(vectorstore: VectorStore, documents: List[Document], document_embedder=None,
+                                 batch_size: int = EMBEDDING_BATCH_SIZE, insert_batch_size: int = INSERT_BATCH_SIZE,
+                                 max_concurrency: int = 4) -> List[str]:
+    """
+    Async counterpart of add_documents_batched that overlaps the two I/O stages: while insert
+    batch N is written to the store, batch N+1 is being embedded. Within an insert batch up to
+    `max_concurrency` embedding requests of `batch_size` texts run at once via `aembed_documents`.
+    Inserts stay sequential and in document order.
+    """
+    if not documents:
+        return []
+    if document_embedder is None:
+        document_embedder = getattr(vectorstore, "embeddings", None)
+    if not hasattr(vectorstore, "add_embeddings") or not hasattr(document_embedder, "aembed_documents"):
+        return await vectorstore.aadd_documents(documents)
+    batch_size = max(1, batch_size)
+    insert_batch_size = max(1, insert_batch_size)
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _embed(texts: List[str]) -> List[List[float]]:
+        async with sem:
+            return await document_embedder.aembed_documents(texts)
+
+    ids = []
+    pending_insert = None
+    try:
+        for i in range(0, len(documents), insert_batch_size):
+            rows = documents[i:i + insert_batch_size]
+            texts = [d.page_content for d in rows]
+            parts = await asyncio.gather(*(_embed(texts[j:j + batch_size]) for j in range(0, len(texts), batch_size)))
+            embeddings = [e for part in parts for e in part]
+            if pending_insert is not None:
+                insert, pending_insert = pending_insert, None
+                ids.extend(await insert)
+            pending_insert = asyncio.create_task(asyncio.to_thread(
+                vectorstore.add_embeddings, texts, embeddings, [d.metadata for d in rows]))
+        insert, pending_insert = pending_insert, None
+        ids.extend(await insert)
+    finally:
+        if pending_insert is not None:
+            # an embed call failed while the previous insert was in flight: let that insert
+            # settle (its worker thread cannot be interrupted) and surface the original error
+            await asyncio.gather(pending_insert, return_exceptions=True)
+    return ids
+
 def create_collection(collection_name: str, vdb_endpoint: str, dimension: int = 2048, collection_type: str = "text") -> None:
     """
     Create a new collection in the Milvus vector database.
@@ -150,6 +266,8 @@ def create_collection(collection_name: str, vdb_endpoint: str, dimension: int =
     """
     config = get_config()
     try:
+        # optional nv_ingest_client dependency, only needed when creating collections
+        from nv_ingest_client.util.milvus import create_nvingest_collection
         url = urlparse(vdb_endpoint)
         connection_alias = f"milvus_{url.hostname}_{url.port}"
         connections.connect(connection_alias, host=url.hostname, port=url.port)
@@ -614,11 +732,12 @@ def add_collection_name_to_retreived_docs(docs: List[Document], collection_name:
         doc.metadata["collection_name"] = collection_name
     return docs
 
-def collection_exists(collections: dict, vdb_endpoint: str) -> bool:
-    existing_collections = get_collection(vdb_endpoint)
-    coll_values = set(collections.values())
-    collection_names = {c['collection_name'] for c in existing_collections}
-    return coll_values.issubset(collection_names)
+def collection_exists(collections: dict, vdb_endpoint: str, existing_collections: Optional[Set[str]] = None) -> bool:
+    # only the names are needed: one list_collections call instead of get_collection's
+    # per-collection entity counts and metadata-schema query
+    if existing_collections is None:
+        existing_collections = list_collection_names(vdb_endpoint)
+    return set(collections.values()).issubset(existing_collections)
 
 
 def add_schema(collections: dict, vdb_endpoint: str):
@@ -638,10 +757,17 @@ def add_schema(collections: dict, vdb_endpoint: str):
 
     return True
 
-def init_collection(collections: dict, embed_dimension, vdb_endpoint: str) -> bool:
-    print(collection_exists(collections, vdb_endpoint))
+def init_collection(collections: dict, embed_dimension, vdb_endpoint: str) -> Set[str]:
+    """
+    Creates `collections` (and their metadata schema) unless they all exist already.
+    Returns the collection names present afterwards, so callers such as get_vectorstores
+    can skip listing the collections again.
+    """
+    existing = list_collection_names(vdb_endpoint)
+    exists = collection_exists(collections, vdb_endpoint, existing_collections=existing)
+    logger.debug("Collections %s exist: %s", list(collections.values()), exists)
     # return True
-    if collection_exists(collections, vdb_endpoint):
+    if exists:
         logger.info(f"Collections already exist: {list(collections.values())}")
     else:
         # Ensure the special metadata-schema collection exists
@@ -650,7 +776,7 @@ def init_collection(collections: dict, embed_dimension, vdb_endpoint: str) -> bo
         # Collections (one per entity type + chunks)
         
         # 1) create the collections (NV helper calls NV-Ingest style creator under the hood)
-        create_collections(
+        created = create_collections(
             list(collections.values()),
             vdb_endpoint=vdb_endpoint,
             dimension=embed_dimension,          # must match your embedder
@@ -658,4 +784,5 @@ def init_collection(collections: dict, embed_dimension, vdb_endpoint: str) -> bo
         )
         # 2) register (optional) metadata schema per collection (used by get_docs_vectorstore_langchain)
         add_schema(collections, vdb_endpoint)
-    return True
\ No newline at end of file
+        existing = existing | set(created["successful"]) | {DEFAULT_METADATA_SCHEMA_COLLECTION}
+    return existing
\ No newline at end of file
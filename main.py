@@ -1,43 +1,105 @@
-import logging, os, time
-from typing import List
-import json
+import logging, os
+import asyncio
+from typing import List, Set, TYPE_CHECKING
+from functools import lru_cache
+from io import BytesIO
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 # from nv_ingest.framework.orchestration.ray.util.pipeline.pipeline_runners import run_pipeline
 # from nv_ingest.framework.orchestration.ray.util.pipeline.pipeline_runners import PipelineCreationSchema
-from nv_ingest_api.util.logging.configuration import configure_logging as configure_local_logging
-from nv_ingest_client.client import Ingestor, NvIngestClient
-from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
+from dotenv import load_dotenv
+# load .env before the app modules are imported: they parse the (cached) config at import time.
+# Set RFP_ASSIST_NO_DOTENV to skip it when the environment is already provisioned.
+if not os.getenv("RFP_ASSIST_NO_DOTENV"):
+    load_dotenv()
 from app.services.ingester import get_nv_ingest_client
 from app.services.extractor import extract_entities_llm
-from app.utils.vectorstore import (create_collections, create_metadata_schema_collection, 
-                                   add_metadata_schema, get_collection, get_vectorstore, delete_collections,
-                                    add_schema, init_collection, collection_exists)
+from app.utils.vectorstore import get_vectorstores, aadd_documents_batched, init_collection
+from app.utils.async_io import read_files_sync
+from app.utils.process_text import dedupe_documents
+from app.utils.process_json import json_dumps_pretty
 from app.utils.common import get_config
 from app.domain.common import COLL
-from dotenv import load_dotenv
-load_dotenv()
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+    from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
 
 # Initialize global objects
 logger = logging.getLogger(__name__)
 
 CONFIG = get_config()
-NV_INGEST_CLIENT_INSTANCE = get_nv_ingest_client()
-DOCUMENT_EMBEDDER = document_embedder = NVIDIAEmbeddings(base_url=os.getenv("EMBEDDING_NIM_ENDPOINT"), model=os.getenv("EMBEDDING_MODEL_NAME"),  dimensions=CONFIG.embeddings.dimensions, truncate="END")
-# NV-Ingest Batch Mode Configuration
-ENABLE_NV_INGEST_BATCH_MODE = os.getenv("ENABLE_NV_INGEST_BATCH_MODE", "true").lower() == "true"
-NV_INGEST_FILES_PER_BATCH = int(os.getenv("NV_INGEST_FILES_PER_BATCH", 16))
-ENABLE_NV_INGEST_PARALLEL_BATCH_MODE = os.getenv("ENABLE_NV_INGEST_PARALLEL_BATCH_MODE", "true").lower() == "true"
-NV_INGEST_CONCURRENT_BATCHES = int(os.getenv("NV_INGEST_CONCURRENT_BATCHES", 4))
+
+@lru_cache(maxsize=1)
+def get_embedder() -> "NVIDIAEmbeddings":
+    """Creates the document embedder on first use, so importing this module stays side-effect free."""
+    from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
+    return NVIDIAEmbeddings(base_url=os.getenv("EMBEDDING_NIM_ENDPOINT"), model=os.getenv("EMBEDDING_MODEL_NAME"),  dimensions=CONFIG.embeddings.dimensions, truncate="END")
 
 split_options = {"chunk_size": 6144, "chunk_overlap": 248}
+
+@lru_cache(maxsize=None)
+def _compute_split_sources(enable_pdf_splitter: bool) -> List[str]:
+    """Source types the split stage runs on; PDFs are only re-split when the PDF splitter is enabled."""
+    split_source_types = ["text", "html"]
+    return ["PDF"] + split_source_types if enable_pdf_splitter else split_source_types
+
 collection_name = "multimodal_data"
 
 
+def run_batch(batch_files: List[str], extract_kwargs: dict, split_source_types: List[str], show_progress: bool = False):
+    """Runs one NV-Ingest job over `batch_files` and returns (results, failures)."""
+    from nv_ingest_client.client import Ingestor
+    ingestor = Ingestor(client=get_nv_ingest_client())
+    if CONFIG.nv_ingest.preload_files and hasattr(ingestor, "buffers"):
+        # read the whole batch concurrently up front and hand the ingestor in-memory buffers
+        contents = read_files_sync(batch_files, depth=max(1, CONFIG.nv_ingest.concurrent_batches) * 16)
+        ingestor = ingestor.buffers([(path, BytesIO(data)) for path, data in zip(batch_files, contents)])
+    else:
+        ingestor = ingestor.files(batch_files)
+    ingestor = ingestor.extract(**extract_kwargs)
+    # nothing to split: skip the stage (and its tokenization) entirely
+    if split_source_types:
+        ingestor = ingestor.split(
+                        tokenizer=CONFIG.nv_ingest.tokenizer,
+                        chunk_size=split_options.get("chunk_size", CONFIG.nv_ingest.chunk_size),
+                        chunk_overlap=split_options.get("chunk_overlap", CONFIG.nv_ingest.chunk_overlap),
+                        params={"split_source_types": split_source_types}
+                    )
+    return ingestor.ingest(return_failures=True, show_progress=show_progress)
+
+def iter_ingest_batches(filepaths: List[str], extract_kwargs: dict, split_source_types: List[str]):
+    """
+    Splits `filepaths` into batches of NV_INGEST_FILES_PER_BATCH (one batch when batch mode is off)
+    and yields each batch's (results, failures) in submission order as soon as it is ready.
+    Up to NV_INGEST_CONCURRENT_BATCHES batches run at a time in parallel batch mode (one otherwise),
+    with one more queued behind them. While the consumer is busy, up to that many plus one finished
+    batches can wait for it, so downstream stages overlap ingestion without the whole run being buffered.
+    """
+    settings = CONFIG.nv_ingest
+    batch_size = max(1, settings.files_per_batch) if settings.enable_batch_mode else max(1, len(filepaths))
+    batches = iter([filepaths[i:i + batch_size] for i in range(0, len(filepaths), batch_size)])
+    parallel = settings.enable_parallel_batch_mode and len(filepaths) > batch_size
+    workers = max(1, settings.concurrent_batches) if parallel else 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(run_batch, batch, extract_kwargs, split_source_types, show_progress=not parallel)
+                        for batch in islice(batches, workers + 1))
+        while pending:
+            output = pending.popleft().result()
+            batch = next(batches, None)
+            if batch is not None:
+                pending.append(executor.submit(run_batch, batch, extract_kwargs, split_source_types, show_progress=not parallel))
+            yield output
+
+
 if __name__=="__main__":
-    ingestor = Ingestor(client=NV_INGEST_CLIENT_INSTANCE)
     # Add files to ingestor
     filepaths = ["/home/ubuntu/projects/datas/rfi for cloud adoption.pdf"]
-    ingestor = ingestor.files(filepaths)
     # Create kwargs for extract method
+    # pdfium rendering / table extraction runs inside the NV-Ingest service, which parallelizes
+    # pages across its own worker processes (MAX_INGEST_PROCESS_WORKERS in the nv-ingest service's
+    # environment, not this process's)
     extract_kwargs = {
         "extract_text": True,
         "extract_infographics": False,
@@ -49,45 +111,50 @@ if __name__=="__main__":
         "paddle_output_format": "markdown", #Literal['markdown','html','text']
         # "extract_audio_params": {"segment_audio": True} # TODO: Uncomment this when audio segmentation to be enabled
     }
-    ingestor = ingestor.extract(**extract_kwargs)
 
-    split_source_types = ["text", "html"]
-    split_source_types = ["PDF"] + split_source_types if CONFIG.nv_ingest.enable_pdf_splitter else split_source_types
+    split_source_types = _compute_split_sources(CONFIG.nv_ingest.enable_pdf_splitter)
     logger.info(f"Post chunk split status: {CONFIG.nv_ingest.enable_pdf_splitter}. Splitting by: {split_source_types}")
-    ingestor = ingestor.split(
-                    tokenizer=CONFIG.nv_ingest.tokenizer,
-                    chunk_size=split_options.get("chunk_size", CONFIG.nv_ingest.chunk_size),
-                    chunk_overlap=split_options.get("chunk_overlap", CONFIG.nv_ingest.chunk_overlap),
-                    params={"split_source_types": split_source_types}
-                )
-    
-    results, failures = ingestor.ingest(return_failures=True, show_progress=True)
-
-    # results blob is directly inspectable
-    # print(ingest_json_results_to_blob(results[0]))
+
+    # initialise collections and metadata schema
+    existing_collections = init_collection(collections=COLL, embed_dimension=CONFIG.embeddings.dimensions,
+                                           vdb_endpoint=CONFIG.vector_store.url)
+
+    # initialise vector store objects for each collections, keyed like COLL; the names listed by
+    # init_collection cover the existence checks and the handles are then created concurrently
+    document_embedder = get_embedder()
+    VS = get_vectorstores(document_embedder, COLL, vdb_endpoint=CONFIG.vector_store.url,
+                          existing_collections=existing_collections)
+
+    # extract entities using LLM; documents are streamed in as their ingest batch lands,
+    # so extraction of one batch overlaps ingestion of the next
+    failures = []
+
+    def stream_results():
+        for batch_results, batch_failures in iter_ingest_batches(filepaths, extract_kwargs, split_source_types):
+            failures.extend(batch_failures)
+            yield from batch_results
+
+    # chunk documents are inserted batch by batch while extraction runs instead of being held until
+    # the end; the shared seen-set drops chunks repeated across batches
+    seen_chunks: Set[int] = set()
+    insert_stats = {"chunks": 0}
+
+    def insert_chunks(batch: "List[Document]"):
+        docs = dedupe_documents(batch, seen=seen_chunks)
+        if docs:
+            # embedding of one insert batch overlaps the write of the previous one
+            ids = asyncio.run(aadd_documents_batched(VS["chunks"], docs, document_embedder,
+                                                     max_concurrency=CONFIG.nv_ingest.concurrent_batches))
+            insert_stats["chunks"] += len(ids)
+
+    json_outs, _ = extract_entities_llm(stream_results(), document_sink=insert_chunks)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Final Extracted JSON: %s", json_dumps_pretty(json_outs))
 
     # (optional) Review any failures that were returned
     if failures:
-        print(f"There were {len(failures)} failures. Sample: {failures[0]}")
-
-    # initialise collections and metadata schema
-    init_collection(collections=COLL, embed_dimension=CONFIG.embeddings.dimensions, vdb_endpoint=CONFIG.vector_store.url)
-
-    # initialise vector store objects for each collections
-    vs_chunks        = get_vectorstore(document_embedder, collection_name=COLL["chunks"],        vdb_endpoint=CONFIG.vector_store.url)
-    vs_requirements  = get_vectorstore(document_embedder, collection_name=COLL["requirements"],  vdb_endpoint=CONFIG.vector_store.url)
-    vs_criteria      = get_vectorstore(document_embedder, collection_name=COLL["criteria"],      vdb_endpoint=CONFIG.vector_store.url)
-    vs_contacts      = get_vectorstore(document_embedder, collection_name=COLL["contacts"],      vdb_endpoint=CONFIG.vector_store.url)
-    vs_deadlines     = get_vectorstore(document_embedder, collection_name=COLL["deadlines"],     vdb_endpoint=CONFIG.vector_store.url)
-    vs_tech          = get_vectorstore(document_embedder, collection_name=COLL["technologies"],  vdb_endpoint=CONFIG.vector_store.url)
-    vs_std           = get_vectorstore(document_embedder, collection_name=COLL["standards"],     vdb_endpoint=CONFIG.vector_store.url)
-    vs_org           = get_vectorstore(document_embedder, collection_name=COLL["organizations"], vdb_endpoint=CONFIG.vector_store.url)
-
-    # extract entities using LLM
-    json_outs, documents = extract_entities_llm(results)
-    print("Final Extracted JSON:", json.dumps(json_outs, indent=2))
-    # print(documents)
-    # vs_chunks.add_documents(documents)
-    # result = vs_chunks.search(query="What is the requirements of the RFP?", search_type="mmr", k=3)
+        logger.warning("There were %d failures. Sample: %s", len(failures), json_dumps_pretty(failures[0]))
+    logger.info("Inserted %d chunk documents into %s", insert_stats["chunks"], COLL["chunks"])
+    # result = VS["chunks"].search(query="What is the requirements of the RFP?", search_type="mmr", k=3)
     # print(result)
     # delete_collections(collection_names=[COLL["chunks"]], vdb_endpoint=CONFIG.vector_store.url)
@@ -0,0 +1,105 @@
+import copy
+import random
+import unittest
+
+from app.domain.common import EMAIL_RE, PHONE_RE, _DATE_REGEX
+from app.utils.process_entity import (
+    _DATE_DB,
+    _KEEP_DIGITS_TBL,
+    _contacts_in_text,
+    contains_date,
+    _text_dates,
+    filter_batch_with_prev_backup,
+    filter_with_prev_backup,
+)
+
+
+def _fold(items, prev_clean=None):
+    merged = copy.deepcopy(prev_clean)
+    for payload, chunk_text in copy.deepcopy(items):
+        merged, _ = filter_with_prev_backup(payload, chunk_text, prev_clean=merged)
+    return merged
+
+
+class FilterBatchMatchesFoldTest(unittest.TestCase):
+    def test_contact_rekeyed_after_unevidenced_name(self):
+        items = [
+            ({"contacts": [{"name": "Bob", "phone": "555-987-6543"}]}, "call 555.987.6543"),
+            ({"contacts": [{"phone": "555-987-6543"}]}, "call 555.987.6543 now"),
+        ]
+        batch, _ = filter_batch_with_prev_backup(copy.deepcopy(items))
+        self.assertEqual(batch["contacts"], [{"name": None, "title": None, "email": None, "phone": "5559876543"}])
+        self.assertEqual(batch, _fold(items))
+
+    def test_random_batches(self):
+        rnd = random.Random(0)
+        names = [None, "Bob", "Ann", ""]
+        emails = [None, "bob@x.com", "Ann <ann@y.org>"]
+        phones = [None, "555-987-6543", "555 111 2222"]
+        texts = [
+            "Bob CTO call 555.987.6543 bob@x.com",
+            "Ann ann@y.org 5551112222",
+            "call 555-987-6543",
+            "nothing here",
+            "Ann CTO 555 111 2222 bob@x.com",
+        ]
+
+        def contact():
+            c = {"name": rnd.choice(names), "email": rnd.choice(emails),
+                 "phone": rnd.choice(phones), "title": rnd.choice([None, "CTO"])}
+            return {k: v for k, v in c.items() if v is not None}
+
+        for _ in range(2000):
+            items = [({"contacts": [contact() for _ in range(rnd.randint(0, 3))]}, rnd.choice(texts))
+                     for _ in range(rnd.randint(1, 5))]
+            prev = {"contacts": [contact() for _ in range(rnd.randint(0, 2))]} if rnd.random() < 0.5 else None
+            batch, _ = filter_batch_with_prev_backup(copy.deepcopy(items), prev_clean=copy.deepcopy(prev))
+            self.assertEqual(batch, _fold(items, prev))
+
+
+class DateScanTest(unittest.TestCase):
+    def test_nbsp_between_date_parts(self):
+        for text in ("Sept\xa029, 2025", "Sep\xa025", "due 29\xa0September\xa02025"):
+            self.assertTrue(contains_date(text), text)
+            self.assertTrue(_text_dates(text), text)
+
+    @unittest.skipIf(_DATE_DB is None, "hyperscan is not installed")
+    def test_hyperscan_matches_re_next_to_non_ascii(self):
+        rnd = random.Random(0)
+        frags = ["Sep 25", "September 29, 2025", "2025-09-29", "29/09/2025", "5th of May", "Jan 5", "Sept", "29",
+                 "2025", " ", "\xa0", "\x1c", "\u2028", "\u00e9", "\u00df", "\u017f", "\u0131", "\u0130", "\u212a",
+                 "\u0301", "\u0663", "\u00b2", "\uff11", "_", "x", "-", ","]
+        for _ in range(20000):
+            text = "".join(rnd.choice(frags) for _ in range(rnd.randint(1, 6)))
+            expected = len(text) >= 4 and _DATE_REGEX.search(text) is not None
+            self.assertEqual(contains_date(text), expected, repr(text))
+
+
+class ContactScanTest(unittest.TestCase):
+    def test_nbsp_between_phone_groups(self):
+        for text in ("call 555\xa0987\xa06543", "tel. (555)\u2009987-6543", "+1\u202f555\xa0987\xa06543"):
+            self.assertTrue(PHONE_RE.search(text), text)
+
+    def test_single_pass_matches_two_regex_scan(self):
+        rnd = random.Random(0)
+        tokens = ["555\xa0987\xa06543", "(555)\u2009111-2222", "+1\u3000555 987 6543", "bob@x.com",
+                  "Ann.Lee@y.org", "fax", "12", "\u0661\u0662\u0663-\u0664\u0665\u0666-\u0667\u0668\u0669\u0660"]
+        seps = [" ", "\xa0", "\u2009", "\n", ", "]
+        for _ in range(2000):
+            text = "".join(rnd.choice(tokens) + rnd.choice(seps) for _ in range(rnd.randint(1, 6)))
+            emails = {m.group(0).lower() for m in EMAIL_RE.finditer(text)}
+            phones = {m.group(0).translate(_KEEP_DIGITS_TBL) for m in PHONE_RE.finditer(text)}
+            self.assertEqual(_contacts_in_text(text), (emails, phones), repr(text))
+
+    def test_nbsp_phone_contact_is_kept(self):
+        merged, _ = filter_with_prev_backup({"contacts": [{"name": "Bob", "phone": "555-987-6543"}]},
+                                            "Bob: 555\xa0987\xa06543")
+        self.assertEqual([c["phone"] for c in merged["contacts"]], ["5559876543"])
+
+    def test_email_classes_are_ascii(self):
+        self.assertEqual(EMAIL_RE.search("Bob.Smith@Example.COM").group(0), "Bob.Smith@Example.COM")
+        self.assertEqual(EMAIL_RE.search("a\u0131b@x.com").group(0), "b@x.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
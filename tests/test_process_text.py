@@ -0,0 +1,47 @@
+import random
+import unittest
+from types import SimpleNamespace
+
+from app.utils.process_text import ChunkDeduper, dedupe_documents
+
+
+def _chunk(rnd, n_words=800):
+    words = ["proposal", "vendor", "shall", "provide", "cloud", "services", "with", "support",
+             "for", "the", "agency", "migration", "security", "data", "and", "reporting"]
+    return " ".join(rnd.choice(words) for _ in range(n_words))
+
+
+class ChunkDeduperTest(unittest.TestCase):
+    def test_exact_duplicate_is_skipped(self):
+        deduper = ChunkDeduper()
+        text = _chunk(random.Random(0))
+        self.assertFalse(deduper.is_duplicate(text))
+        self.assertTrue(deduper.is_duplicate("  " + text.replace(" ", "\n", 3)))
+
+    def test_changed_date_or_contact_is_not_skipped(self):
+        rnd = random.Random(0)
+        for _ in range(50):
+            body = _chunk(rnd)
+            deduper = ChunkDeduper()
+            self.assertFalse(deduper.is_duplicate(f"Proposals are due September 29, 2025. {body}"))
+            self.assertFalse(deduper.is_duplicate(f"Proposals are due October 13, 2025. {body}"))
+            self.assertFalse(deduper.is_duplicate(f"{body} Contact Ann Lee at ann@y.org, 555-987-6543."))
+
+    def test_near_duplicates_are_opt_in(self):
+        body = _chunk(random.Random(1))
+        deduper = ChunkDeduper(near_duplicates=True)
+        self.assertFalse(deduper.is_duplicate(f"Proposals are due September 29, 2025. {body}"))
+        self.assertTrue(deduper.is_duplicate(f"Proposals are due October 13, 2025. {body}"))
+
+
+class DedupeDocumentsTest(unittest.TestCase):
+    def test_shared_seen_set_dedupes_across_batches(self):
+        docs = [SimpleNamespace(page_content=t) for t in ("a", "b", "a", "c", "b", "d")]
+        seen = set()
+        batches = [dedupe_documents(docs[i:i + 2], seen=seen) for i in range(0, len(docs), 2)]
+        self.assertEqual([[d.page_content for d in b] for b in batches], [["a", "b"], ["c"], ["d"]])
+        self.assertEqual([d.page_content for d in dedupe_documents(docs)], ["a", "b", "c", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()